@@ -4,14 +4,19 @@ import json
 from enum import Enum
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 
 from app.db.prisma import prisma
 from app.db.prisma_client.fields import Json
+from app.db.scoreboard import decode_cursor, encode_cursor, scoreboard
+from app.db.sport_registry import sport_registry
+from app.api.utils.projection import MatchProjection
+from app.api.utils.responses import FastJSONRoute
 from app.api.utils.security import get_current_user, get_current_super_admin, validate_csrf_token
+from app.realtime.bus import publish_announcement_change, publish_match_change, publish_user_change
 
-router = APIRouter(prefix="/admin", tags=["admin"])
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=FastJSONRoute)
 
 
 class MatchStatus(str, Enum):
@@ -57,7 +62,7 @@ async def create_match(
     current_admin=Depends(get_current_user),
     _csrf: None = Depends(validate_csrf_token)
 ) -> dict:
-    sport = await prisma.sport.find_unique(where={"slug": body.sportSlug})
+    sport = await sport_registry.by_slug(body.sportSlug)
     if sport is None:
         raise HTTPException(status_code=404, detail="Sport not found")
 
@@ -84,7 +89,9 @@ async def create_match(
         # Convert dict to Prisma Json type
         create_data["score"] = Json(body.score)
 
-    match = await prisma.match.create(data=create_data)
+    match = await prisma.match.create(data=create_data, include={"sport": True})
+    scoreboard.upsert(match)
+    publish_match_change("create", match)
     return {"item": match}
 
 
@@ -160,6 +167,8 @@ async def update_match(
         data=update_data,
         include={"sport": True}
     )
+    scoreboard.upsert(updated_match)
+    publish_match_change("update", updated_match)
     
     return {"item": updated_match}
 
@@ -185,6 +194,8 @@ async def delete_match(
     
     # Delete the match
     await prisma.match.delete(where={"id": match_id})
+    scoreboard.remove(match_id)
+    publish_match_change("delete", match)
     
     return {"message": "Match deleted successfully"}
 
@@ -193,28 +204,37 @@ async def delete_match(
 async def list_admin_matches(
     current_admin=Depends(get_current_user),
     sport_id: str | None = None,
-    status: str | None = None
+    status: str | None = None,
+    limit: int = Query(200, ge=1, le=200, description="Page size"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    fields: str | None = Query(None, description="Comma-separated match fields to return"),
+    expand: str | None = Query(None, description="Relations to include alongside fields: sport")
 ) -> dict:
     """List matches for admin - filtered by their sport if not SUPER_ADMIN"""
-    where_clause = {}
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    projection = MatchProjection.from_query(fields, expand)
     
     # Sport admins can only see their sport's matches
     if current_admin.role != "SUPER_ADMIN":
-        where_clause["sportId"] = current_admin.sportId
-    elif sport_id:
-        where_clause["sportId"] = sport_id
-    
-    if status:
-        where_clause["status"] = status
-    
-    matches = await prisma.match.find_many(
-        where=where_clause,
-        include={"sport": True},
-        order=[{"status": "asc"}, {"updatedAt": "desc"}],  # LIVE first for admins
-        take=200  # Limit to prevent excessive data transfer
+        if not current_admin.sportId:
+            return {"items": [], "next_cursor": None}
+        sport_id = current_admin.sportId
+    
+    await scoreboard.ensure_loaded()
+    matches, next_after = scoreboard.page(
+        sport_id=sport_id,
+        statuses=[status] if status else None,
+        limit=limit,
+        after=after
     )
     
-    return {"items": matches}
+    return {
+        "items": projection.apply_all(matches),
+        "next_cursor": encode_cursor(next_after) if next_after else None
+    }
 
 
 # Announcement Management
@@ -233,6 +253,7 @@ async def create_announcement(
             "pinned": body.pinned
         }
     )
+    publish_announcement_change("create", announcement.id)
     
     return {"item": announcement}
 
@@ -264,6 +285,7 @@ async def update_announcement(
         where={"id": announcement_id},
         data=update_data
     )
+    publish_announcement_change("update", announcement_id)
     
     return {"item": updated_announcement}
 
@@ -280,6 +302,7 @@ async def delete_announcement(
         await prisma.announcement.delete(where={"id": announcement_id})
     except Exception:
         raise HTTPException(status_code=404, detail="Announcement not found")
+    publish_announcement_change("delete", announcement_id)
     
     return {"message": "Announcement deleted successfully"}
 
@@ -305,7 +328,7 @@ async def create_user(
     _csrf: None = Depends(validate_csrf_token)
 ) -> dict:
     """Create a new admin user (SUPER_ADMIN only)"""
-    from app.api.utils.security import get_password_hash
+    from app.api.utils.security import get_password_hash_async
     
     # Validate role
     if body.role not in ["SUPER_ADMIN", "SPORT_ADMIN"]:
@@ -339,7 +362,7 @@ async def create_user(
     
     # Validate sport exists if sportId provided
     if body.sportId:
-        sport = await prisma.sport.find_unique(where={"id": body.sportId})
+        sport = await sport_registry.by_id(body.sportId)
         if not sport:
             raise HTTPException(
                 status_code=404,
@@ -353,7 +376,7 @@ async def create_user(
             "id": secrets.token_urlsafe(16),
             "username": body.username,
             "email": body.email,
-            "passwordHash": get_password_hash(body.password),
+            "passwordHash": await get_password_hash_async(body.password),
             "role": body.role,
             "sportId": body.sportId
         },
@@ -397,7 +420,7 @@ async def update_user(
     _csrf: None = Depends(validate_csrf_token)
 ) -> dict:
     """Update user email or password (SUPER_ADMIN only)"""
-    from app.api.utils.security import get_password_hash
+    from app.api.utils.security import get_password_hash_async
     
     # Find the user
     user = await prisma.user.find_unique(where={"id": user_id})
@@ -425,7 +448,7 @@ async def update_user(
     
     if body.password is not None:
         # Hash the new password
-        update_data["passwordHash"] = get_password_hash(body.password)
+        update_data["passwordHash"] = await get_password_hash_async(body.password)
     
     if not update_data:
         raise HTTPException(
@@ -439,6 +462,7 @@ async def update_user(
         data=update_data,
         include={"sport": True}
     )
+    publish_user_change("update", user_id)
     
     # Return without password hash
     user_dict = updated_user.model_dump(mode='json')
@@ -4,38 +4,54 @@ from __future__ import annotations
 import asyncio
 import logging
 import secrets
-import time
-from typing import Dict, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Response
 from pydantic import BaseModel
 
 from app.db.prisma import prisma
+from app.api.utils.login_attempts import failed_logins
+from app.api.utils.responses import FastJSONRoute
+from app.realtime.bus import publish_user_change
 from app.api.utils.security import (
     get_current_user,
-    verify_password,
+    verify_password_async,
     create_access_token,
-    get_password_hash
+    get_password_hash_async,
+    password_needs_rehash,
+    token_cache
 )
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=FastJSONRoute)
 logger = logging.getLogger(__name__)
 
-# Simple in-memory backoff for failed logins.
-# Note: This is best-effort for single-process deployments and dev; for production,
-# use a shared store (Redis) or an API gateway/WAF rate limiter.
-_FAILED_LOGINS: Dict[str, Tuple[int, float]] = {}
-_WINDOW_SECONDS = 300.0
+# Failed-login backoff. The tracker is per process by default; set
+# FAILED_LOGIN_BACKEND=sqlite to share it between workers on one host.
 _MAX_DELAY_SECONDS = 2.0
 
 
-def _prune_failed_logins(now: float) -> None:
-    if not _FAILED_LOGINS:
-        return
-    # Remove entries outside the window to prevent unbounded growth
-    expired = [ip for ip, (_count, first_ts) in _FAILED_LOGINS.items() if (now - first_ts) > _WINDOW_SECONDS]
-    for ip in expired:
-        _FAILED_LOGINS.pop(ip, None)
+async def _record_failed_login(request: Request) -> None:
+    count = await failed_logins.record_failure(_client_ip(request))
+    await asyncio.sleep(min(0.25 + 0.25 * count, _MAX_DELAY_SECONDS))
+
+
+async def _upgrade_password_hash(user_id: str, password: str, old_hash: str) -> None:
+    """
+    Rehash with the configured bcrypt cost (runs after the login response).
+    Only replaces old_hash: if the password was changed in the meantime, the
+    new hash is kept.
+    """
+    try:
+        password_hash = await get_password_hash_async(password)
+        updated = await prisma.user.update_many(
+            where={"id": user_id, "passwordHash": old_hash},
+            data={"passwordHash": password_hash}
+        )
+        if not updated:
+            return
+        publish_user_change("update", user_id)
+    except Exception as e:
+        # Not fatal: the next login tries again
+        logger.warning(f"Password rehash failed for user {user_id}: {e}")
 
 
 def _client_ip(request: Request) -> str:
@@ -65,7 +81,12 @@ class UserResponse(BaseModel):
 
 
 @router.post("/login", response_model=LoginResponse)
-async def login(credentials: LoginRequest, request: Request, response: Response) -> dict:
+async def login(
+    credentials: LoginRequest,
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks
+) -> dict:
     """
     Admin login endpoint.
     Sets HttpOnly cookie with JWT and returns CSRF token.
@@ -76,36 +97,25 @@ async def login(credentials: LoginRequest, request: Request, response: Response)
         include={"sport": True}
     )
     
-    now = time.time()
-    _prune_failed_logins(now)
-
     if not user:
-        ip = _client_ip(request)
-        count, first_ts = _FAILED_LOGINS.get(ip, (0, now))
-        if (now - first_ts) > _WINDOW_SECONDS:
-            count, first_ts = 0, now
-        count += 1
-        _FAILED_LOGINS[ip] = (count, first_ts)
-        await asyncio.sleep(min(0.25 + 0.25 * count, _MAX_DELAY_SECONDS))
+        await _record_failed_login(request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
     
     # Verify password
-    if not verify_password(credentials.password, user.passwordHash):
-        ip = _client_ip(request)
-        count, first_ts = _FAILED_LOGINS.get(ip, (0, now))
-        if (now - first_ts) > _WINDOW_SECONDS:
-            count, first_ts = 0, now
-        count += 1
-        _FAILED_LOGINS[ip] = (count, first_ts)
-        await asyncio.sleep(min(0.25 + 0.25 * count, _MAX_DELAY_SECONDS))
+    if not await verify_password_async(credentials.password, user.passwordHash):
+        await _record_failed_login(request)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
         )
     
+    # Move hashes made with an old bcrypt cost to the configured one
+    if password_needs_rehash(user.passwordHash):
+        background_tasks.add_task(_upgrade_password_hash, user.id, credentials.password, user.passwordHash)
+    
     # Create access token
     access_token = create_access_token(data={"sub": user.id})
     
@@ -113,8 +123,7 @@ async def login(credentials: LoginRequest, request: Request, response: Response)
     csrf_token = secrets.token_urlsafe(32)
 
     # Clear failed-login backoff on success
-    ip = _client_ip(request)
-    _FAILED_LOGINS.pop(ip, None)
+    await failed_logins.reset(_client_ip(request))
     
     # Log user agent at DEBUG level for troubleshooting iOS issues
     if logger.isEnabledFor(logging.DEBUG):
@@ -208,10 +217,13 @@ async def verify_token(current_user=Depends(get_current_user)) -> dict:
 
 
 @router.post("/logout")
-async def logout(response: Response) -> dict:
+async def logout(request: Request, response: Response) -> dict:
     """
     Logout by clearing authentication cookies.
     """
+    token = request.cookies.get("access_token")
+    if token:
+        token_cache.invalidate_token(token)
     response.delete_cookie(key="access_token", path="/", secure=True, samesite="none")
     response.delete_cookie(key="csrf_token", path="/", secure=True, samesite="none")
     return {"message": "Logged out successfully"}
@@ -227,7 +239,7 @@ async def update_profile(
     Requires current password for verification.
     """
     # Verify current password
-    if not verify_password(data.current_password, current_user.passwordHash):
+    if not await verify_password_async(data.current_password, current_user.passwordHash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect",
@@ -251,7 +263,7 @@ async def update_profile(
     
     # Update password if provided
     if data.password:
-        update_data["passwordHash"] = get_password_hash(data.password)
+        update_data["passwordHash"] = await get_password_hash_async(data.password)
     
     # Update user
     if not update_data:
@@ -265,6 +277,7 @@ async def update_profile(
         data=update_data,
         include={"sport": True}
     )
+    publish_user_change("update", current_user.id)
     
     user_data = {
         "id": updated_user.id,
@@ -1,8 +1,21 @@
 import os
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
+from app.api.utils.cache import response_cache
+from app.api.utils.compression import compression_stats
+from app.api.utils.login_attempts import failed_logins
+from app.api.utils.password_pool import password_pool
+from app.api.utils.security import get_current_super_admin, principal_cache, token_cache
 from app.db.prisma import prisma
+from app.db.scoreboard import scoreboard
+from app.db.snapshots import snapshot_exporter
+from app.realtime.announcements import announcement_feed
+from app.realtime.bus import change_bus
+from app.realtime.hub import live_hub
+from app.realtime.limits import stream_limiter
+from app.realtime.subscriber import stream_metrics
+from app.realtime.watchers import match_watchers
 
 router = APIRouter(tags=["health"])
 
@@ -33,3 +46,38 @@ async def health() -> dict:
             "message": str(e) if is_debug else "unavailable",
             "database": "error"
         }
+
+
+@router.get("/health/streams")
+async def stream_health() -> dict:
+    """Live-stream gauges: connections, queue depths, slow-consumer and change-bus drops"""
+    return {
+        "connections": stream_limiter.stats(),
+        "topics": live_hub.stats(),
+        "match_watchers": match_watchers.stats(),
+        "announcements": announcement_feed.stats(),
+        "change_bus": change_bus.stats(),
+        "totals": dict(stream_metrics),
+    }
+
+
+@router.get("/health/cache")
+async def cache_health() -> dict:
+    """Cache counters, scoreboard size, compression and snapshot totals"""
+    return {
+        "responses": response_cache.stats(),
+        "scoreboard": scoreboard.stats(),
+        "compression": compression_stats(),
+        "snapshots": snapshot_exporter.stats(),
+    }
+
+
+@router.get("/health/auth")
+async def auth_health(current_admin=Depends(get_current_super_admin)) -> dict:
+    """Principal and token caches, password pool saturation and failed-login counters (SUPER_ADMIN only)"""
+    return {
+        "principals": principal_cache.stats(),
+        "tokens": token_cache.stats(),
+        "passwords": password_pool.stats(),
+        "failed_logins": failed_logins.stats(),
+    }
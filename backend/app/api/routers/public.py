@@ -1,271 +1,313 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from datetime import datetime
+import weakref
 
-from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, WebSocket
 from fastapi.responses import StreamingResponse, JSONResponse
 
+from app.api.utils.responses import FastJSONRoute
+from app.api.utils.cache import data_versions, etag_matches, response_cache
+from app.api.utils.projection import MatchProjection
+from app.api.utils.serialization import content_digest
 from app.db.prisma import prisma
+from app.db.scoreboard import decode_cursor, encode_cursor, scoreboard
+from app.db.sport_registry import sport_registry
+from app.realtime.bus import ChangeEvent, change_bus
+from app.realtime.hub import live_hub, parse_event_id
+from app.realtime.limits import StreamLease, stream_limiter
+from app.realtime.multiplex import LiveSocket
+from app.realtime.subscriber import iter_frames
+from app.realtime.watchers import match_watchers
 
-router = APIRouter(prefix="/public", tags=["public"])
+router = APIRouter(prefix="/public", tags=["public"], route_class=FastJSONRoute)
 
-# Simple in-memory cache for frequently accessed data
-_sports_cache = None
-_sports_cache_time = 0
-SPORTS_CACHE_TTL = 300  # 5 minutes
+# Cache TTL (seconds). Admin writes invalidate entries immediately through the
+# change bus, so this only bounds staleness for writes the bus cannot see.
+# Past the TTL an entry is still served for ANNOUNCEMENTS_STALE_TTL while one
+# request refreshes it in the background.
+ANNOUNCEMENTS_CACHE_TTL = 120
+ANNOUNCEMENTS_STALE_TTL = 120
+
+
+def _invalidate_cached_responses(event: ChangeEvent) -> None:
+    # Match versions are bumped by the scoreboard once a change is applied
+    if event.kind == "announcement":
+        response_cache.invalidate("announcements")
+
+
+change_bus.subscribe(_invalidate_cached_responses)
+
+
+def _dump_items(items) -> list[dict]:
+    return [item.model_dump(mode='json') for item in items]
+
+
+def _conditional(collection: str, if_none_match: str | None, response: Response) -> Response | None:
+    """
+    Set the collection's ETag on response. Returns a 304 to send instead if the
+    client already has this version; callers check this before touching the DB.
+    """
+    etag = data_versions.etag(collection)
+    response.headers["ETag"] = etag
+    if etag_matches(if_none_match, etag):
+        headers = {"ETag": etag}
+        if "Cache-Control" in response.headers:
+            headers["Cache-Control"] = response.headers["Cache-Control"]
+        return Response(status_code=304, headers=headers)
+    return None
 
 
 @router.get("/sports")
-async def list_sports(response: Response) -> dict:
-    """List all available sports (cached)"""
-    global _sports_cache, _sports_cache_time
-    
-    current_time = datetime.utcnow().timestamp()
-    
-    # Return cached data if still valid
-    if _sports_cache and (current_time - _sports_cache_time) < SPORTS_CACHE_TTL:
-        response.headers["X-Cache"] = "HIT"
-        return {"items": _sports_cache}
-    
-    # Fetch from database
-    sports = await prisma.sport.find_many(order={"name": "asc"})
-    
-    # Update cache
-    _sports_cache = [sport.model_dump(mode='json') for sport in sports]
-    _sports_cache_time = current_time
+async def list_sports(
+    response: Response,
+    if_none_match: str | None = Header(None)
+) -> dict:
+    """List all available sports (served from the sport registry)"""
+    # Read first so a stale registry starts its refresh even when we answer 304
+    items = await sport_registry.items()
     
-    response.headers["X-Cache"] = "MISS"
     response.headers["Cache-Control"] = "public, max-age=300"  # Browser cache for 5 min
+    not_modified = _conditional("sports", if_none_match, response)
+    if not_modified is not None:
+        return not_modified
     
-    return {"items": sports}
+    return {"items": items}
 
 
 @router.get("/sports/{sport_slug}")
-async def get_sport(sport_slug: str) -> dict:
-    """Get a single sport by slug"""
-    sport = await prisma.sport.find_unique(where={"slug": sport_slug})
+async def get_sport(
+    sport_slug: str,
+    response: Response,
+    if_none_match: str | None = Header(None)
+) -> dict:
+    """Get a single sport by slug (served from the sport registry)"""
+    sport = await sport_registry.by_slug(sport_slug)
     if sport is None:
         raise HTTPException(status_code=404, detail="Sport not found")
+    
+    not_modified = _conditional("sports", if_none_match, response)
+    if not_modified is not None:
+        return not_modified
+    
     return {"item": sport}
 
 
 @router.get("/matches")
 async def list_matches(
+    response: Response,
     sport_slug: str | None = Query(None, description="Filter by sport slug"),
     status: str | None = Query(None, description="Filter by status: UPCOMING, LIVE, COMPLETED"),
-    limit: int = Query(50, le=100, description="Maximum number of matches to return")
+    limit: int = Query(50, ge=1, le=100, description="Maximum number of matches to return"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    fields: str | None = Query(None, description="Comma-separated match fields to return, e.g. teamA,teamB,status,score"),
+    expand: str | None = Query(None, description="Relations to include alongside fields: sport"),
+    if_none_match: str | None = Header(None)
 ) -> dict:
-    """List matches with optional filters"""
-    where_clause = {}
+    """
+    List matches with optional filters (served from the in-memory scoreboard).
+    Pages are keyset-based: pass the returned next_cursor to get the next one.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    projection = MatchProjection.from_query(fields, expand)
+    
+    # Scores change often: let browsers keep the body but always revalidate
+    response.headers["Cache-Control"] = "no-cache"
+    not_modified = _conditional("matches", if_none_match, response)
+    if not_modified is not None:
+        return not_modified
+    
+    await scoreboard.ensure_loaded()
     
     # Filter by sport if provided
+    sport_id = None
     if sport_slug:
-        sport = await prisma.sport.find_unique(where={"slug": sport_slug})
+        sport = await sport_registry.by_slug(sport_slug)
         if sport:
-            where_clause["sportId"] = sport.id
-    
-    # Filter by status if provided
-    if status:
-        where_clause["status"] = status
+            sport_id = sport.id
     
-    matches = await prisma.match.find_many(
-        where=where_clause,
-        include={"sport": True},
-        order=[{"status": "asc"}, {"updatedAt": "desc"}],  # LIVE first, then UPCOMING, then COMPLETED
-        take=limit
+    # UPCOMING, LIVE, then COMPLETED (enum order), newest first within each
+    matches, next_after = scoreboard.page(
+        sport_id=sport_id,
+        statuses=[status] if status else None,
+        limit=limit,
+        after=after
     )
-    return {"items": matches}
+    return {
+        "items": projection.apply_all(matches),
+        "next_cursor": encode_cursor(next_after) if next_after else None
+    }
 
 
 @router.get("/matches/{match_id}")
-async def get_match(match_id: str) -> dict:
-    """Get a single match by ID"""
-    match = await prisma.match.find_unique(
-        where={"id": match_id},
-        include={"sport": True}
-    )
+async def get_match(
+    match_id: str,
+    response: Response,
+    fields: str | None = Query(None, description="Comma-separated match fields to return"),
+    expand: str | None = Query(None, description="Relations to include alongside fields: sport"),
+    if_none_match: str | None = Header(None)
+) -> dict:
+    """Get a single match by ID (served from the in-memory scoreboard)"""
+    projection = MatchProjection.from_query(fields, expand)
+    response.headers["Cache-Control"] = "no-cache"
+    not_modified = _conditional("matches", if_none_match, response)
+    if not_modified is not None:
+        return not_modified
+    
+    await scoreboard.ensure_loaded()
+    match = scoreboard.get(match_id)
     if match is None:
         raise HTTPException(status_code=404, detail="Match not found")
-    return {"item": match}
+    return {"item": projection.apply(match)}
 
 
 @router.get("/announcements")
 async def list_announcements(
     response: Response,
-    limit: int = Query(20, le=50, description="Maximum number of announcements to return")
+    limit: int = Query(20, le=50, description="Maximum number of announcements to return"),
+    if_none_match: str | None = Header(None)
 ) -> dict:
-    """List recent announcements (pinned first)"""
-    items = await prisma.announcement.find_many(
-        order=[{"pinned": "desc"}, {"updatedAt": "desc"}],
-        take=limit
+    """
+    List recent announcements (pinned first, cached until the next announcement write).
+    The ETag is a digest of the body, so writes the change bus never sees still
+    change it once the cache reloads.
+    """
+    response.headers["Cache-Control"] = "public, max-age=60"  # 1 minute cache
+    
+    async def load() -> tuple[dict, str]:
+        items = await prisma.announcement.find_many(
+            order=[{"pinned": "desc"}, {"updatedAt": "desc"}],
+            take=limit
+        )
+        body = {"items": _dump_items(items)}
+        return body, f'"announcements-{content_digest(body)}"'
+    
+    (body, etag), hit = await response_cache.get_or_load(
+        f"announcements:{limit}",
+        load,
+        ANNOUNCEMENTS_CACHE_TTL,
+        tags=["announcements"],
+        stale_ttl=ANNOUNCEMENTS_STALE_TTL
     )
     
-    # Add cache headers for static content
-    response.headers["Cache-Control"] = "public, max-age=60"  # 1 minute cache
+    response.headers["ETag"] = etag
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": response.headers["Cache-Control"]})
     
-    return {"items": items}
+    return body
+
+
+def _client_ip(request: Request | WebSocket) -> str:
+    return (request.client.host if request.client else "unknown")
+
+
+def _sse_response(generator, lease: StreamLease) -> StreamingResponse:
+    # A generator that is never started never runs its finally block,
+    # so also free the connection slot when it is garbage collected. Only the
+    # slot: the finalizer may run outside the event loop, and a generator that
+    # never started has no subscription to drop.
+    weakref.finalize(generator, lease.release_slot)
+    return StreamingResponse(
+        generator,
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"  # Disable buffering for nginx
+        }
+    )
 
 
 @router.get("/live-stream")
 async def live_stream(
+    request: Request,
     sport_slug: str | None = Query(None, description="Filter by sport slug"),
-    interval: int = Query(5, ge=2, le=30, description="Update interval in seconds")
+    interval: int = Query(5, ge=2, le=30, description="Deprecated: updates are pushed on change"),
+    deltas: bool = Query(False, description="Send one snapshot followed by per-match delta events"),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID")
 ):
     """
     Server-Sent Events stream for live match updates.
-    Pushes live and upcoming matches to frontend at regular intervals.
-    Optimized with change detection to reduce unnecessary updates.
+    Pushes live and upcoming matches to frontend as soon as an admin write changes them.
+    All clients watching the same sport filter share one poller in the live hub,
+    so database load depends on the number of distinct filters, not viewers.
+
+    With deltas=true the stream sends a `snapshot` event, then `upsert`, `remove`
+    and `announcements` events, each with an `id:`. Reconnecting clients that send
+    Last-Event-ID only receive the events they missed (or a fresh snapshot).
+
+    Idle streams get a heartbeat comment, which is also when a vanished client
+    is detected and its subscription dropped.
     """
+    lease = stream_limiter.acquire(_client_ip(request))
+    
     async def event_generator():
-        last_data_hash = None
-        sport_id_cache = None
-        
-        while True:
-            try:
-                # Build query for live and upcoming matches
-                where_clause = {"status": {"in": ["LIVE", "UPCOMING"]}}
-                
-                # Cache sport_id lookup to avoid repeated queries
-                if sport_slug:
-                    if not sport_id_cache:
-                        sport = await prisma.sport.find_unique(where={"slug": sport_slug})
-                        if sport:
-                            sport_id_cache = sport.id
-                    if sport_id_cache:
-                        where_clause["sportId"] = sport_id_cache
-                
-                # Fetch matches with optimized query
-                matches = await prisma.match.find_many(
-                    where=where_clause,
-                    include={"sport": True},
-                    order=[{"status": "asc"}, {"updatedAt": "desc"}],
-                    take=50  # Limit to reduce query size
-                )
-                
-                # Fetch pinned announcements (less frequently changing data)
-                announcements = await prisma.announcement.find_many(
-                    where={"pinned": True},
-                    order={"updatedAt": "desc"},
-                    take=3
-                )
-                
-                # Convert Prisma models to dict for JSON serialization
-                matches_data = [match.model_dump(mode='json') for match in matches]
-                announcements_data = [ann.model_dump(mode='json') for ann in announcements]
-                
-                # Prepare data payload - separate live and upcoming matches
-                live_matches = [m for m in matches_data if m["status"] == "LIVE"]
-                upcoming_matches = [m for m in matches_data if m["status"] == "UPCOMING"]
-                
-                # Create data hash for change detection (exclude timestamp)
-                data_for_hash = {
-                    "live": live_matches[0] if live_matches else None,
-                    "upcoming": upcoming_matches,
-                    "announcements": announcements_data
-                }
-                current_hash = hash(json.dumps(data_for_hash, sort_keys=True))
-                
-                # Only send update if data has actually changed
-                if current_hash != last_data_hash:
-                    data = {
-                        **data_for_hash,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                    
-                    # Send SSE event
-                    yield f"data: {json.dumps(data)}\n\n"
-                    last_data_hash = current_hash
-                
-                # Wait for next interval
-                await asyncio.sleep(interval)
-                
-            except Exception as e:
-                # Send error event
-                error_data = {
-                    "error": str(e),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                yield f"event: error\ndata: {json.dumps(error_data)}\n\n"
-                await asyncio.sleep(interval)
+        subscriber = live_hub.subscribe(
+            sport_slug,
+            deltas=deltas,
+            last_event_id=parse_event_id(last_event_id) if deltas else None,
+        )
+        lease.bind(subscriber.close, lambda: live_hub.unsubscribe(subscriber))
+        subscriber.on_evict = lease.closing
+        try:
+            async for frame in iter_frames(subscriber, request.is_disconnected):
+                yield frame
+        finally:
+            lease.release()
     
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"  # Disable buffering for nginx
-        }
-    )
+    return _sse_response(event_generator(), lease)
 
 
 @router.get("/live-stream/match/{match_id}")
 async def live_stream_single_match(
+    request: Request,
     match_id: str,
-    interval: int = Query(3, ge=1, le=15, description="Update interval in seconds")
+    interval: int = Query(3, ge=1, le=15, description="Deprecated: updates are pushed on change")
 ):
     """
     Server-Sent Events stream for a single match.
     Useful for dedicated match detail pages.
-    Optimized with change detection.
+    All viewers of a match share one watcher that wakes up on change events for
+    this match and only polls as a safety net. The stream ends after the final
+    update of a COMPLETED match.
     """
+    lease = stream_limiter.acquire(_client_ip(request))
+    
     async def event_generator():
-        last_match_hash = None
-        
-        while True:
-            try:
-                # Fetch the specific match
-                match = await prisma.match.find_unique(
-                    where={"id": match_id},
-                    include={"sport": True}
-                )
-                
-                if match is None:
-                    yield f"event: error\ndata: {json.dumps({'error': 'Match not found'})}\n\n"
-                    break
-                
-                match_data = match.model_dump(mode='json')
-                match_hash = hash(json.dumps(match_data, sort_keys=True))
-                
-                # If match is completed, send final update and close
-                if match.status == "COMPLETED":
-                    if match_hash != last_match_hash:
-                        data = {
-                            "match": match_data,
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "final": True
-                        }
-                        yield f"data: {json.dumps(data)}\n\n"
-                    break
-                
-                # Only send update if match data has changed
-                if match_hash != last_match_hash:
-                    data = {
-                        "match": match_data,
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "final": False
-                    }
-                    yield f"data: {json.dumps(data)}\n\n"
-                    last_match_hash = match_hash
-                
-                await asyncio.sleep(interval)
-                
-            except Exception as e:
-                error_data = {
-                    "error": str(e),
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-                yield f"event: error\ndata: {json.dumps(error_data)}\n\n"
-                await asyncio.sleep(interval)
+        subscriber = match_watchers.subscribe(match_id)
+        lease.bind(subscriber.close, lambda: match_watchers.unsubscribe(subscriber))
+        subscriber.on_evict = lease.closing
+        try:
+            async for frame in iter_frames(subscriber, request.is_disconnected):
+                yield frame
+        finally:
+            lease.release()
     
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
-    )
+    return _sse_response(event_generator(), lease)
+
+
+@router.websocket("/live-ws")
+async def live_socket(websocket: WebSocket):
+    """
+    Multiplexed WebSocket for live updates.
+    One connection can subscribe to any mix of "sport:<slug>" (or "sport:*"),
+    "match:<id>" and "announcements" channels, sharing the same topics and
+    watchers as the SSE endpoints. See LiveSocket for the message format.
+    """
+    try:
+        lease = stream_limiter.acquire(_client_ip(websocket))
+    except HTTPException:
+        await websocket.close(code=1013)  # Try again later
+        return
+    
+    # Past its maximum lifetime the socket is closed with "going away"
+    lease.bind(lambda: asyncio.ensure_future(websocket.close(code=1001)))
+    try:
+        await websocket.accept()
+        await LiveSocket(websocket, on_evict=lease.closing, on_recover=lease.recovered).run()
+    finally:
+        lease.release()
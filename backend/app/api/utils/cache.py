@@ -0,0 +1,222 @@
+"""In-memory response cache with per-key TTLs, LRU eviction and tag invalidation"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    expires_at: float
+    stale_until: float  # Past expiry, may still be served while a refresh runs
+    tags: frozenset[str] = field(default_factory=frozenset)
+
+
+class ResponseCache:
+    """
+    Bounded key/value cache. Each entry has its own TTL and a set of tags;
+    invalidate(tag) drops every entry carrying that tag, so writers only need to
+    know what changed, not which keys were derived from it.
+
+    get_or_load() coalesces concurrent misses on a key into one loader call and,
+    for entries set with a stale_ttl, serves the expired value while a single
+    background refresh runs. Invalidated entries are never served stale.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.load_errors = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._epoch = 0  # Bumped by every invalidate()
+
+    def _lookup(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry.stale_until <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Fresh entry for key, or None."""
+        entry = self._lookup(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        tags: Iterable[str] = (),
+        stale_ttl: float = 0,
+    ) -> CacheEntry:
+        if key in self._entries:
+            self._remove(key)
+        expires_at = time.monotonic() + ttl
+        entry = CacheEntry(value, expires_at, expires_at + stale_ttl, frozenset(tags))
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+        return entry
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: float,
+        tags: Iterable[str] = (),
+        stale_ttl: float = 0,
+    ) -> tuple[Any, bool]:
+        """
+        Return (value, hit). A fresh or stale entry counts as a hit; a stale one
+        also starts a background refresh. On a miss, wait for the key's single
+        in-flight load.
+        """
+        entry = self._lookup(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if entry.expires_at > time.monotonic():
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start_load(key, loader, ttl, tags, stale_ttl)
+            return entry.value, True
+
+        self.misses += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader, ttl, tags, stale_ttl)
+        else:
+            self.coalesced += 1
+        # Shielded so one caller disconnecting doesn't cancel the load for the rest
+        return await asyncio.shield(task), False
+
+    def _start_load(self, key, loader, ttl, tags, stale_ttl) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, loader, ttl, tags, stale_ttl))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._load_done(key, t))
+        return task
+
+    async def _load(self, key, loader, ttl, tags, stale_ttl) -> Any:
+        epoch = self._epoch
+        value = await loader()
+        # A write during the load may have made value stale; serve it but don't keep it
+        if epoch == self._epoch:
+            self.set(key, value, ttl, tags, stale_ttl)
+        return value
+
+    def _load_done(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Logged here because a background refresh has no caller to raise to
+            self.load_errors += 1
+            logger.warning(f"Cache load failed for {key}: {task.exception()!r}")
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of the given tags."""
+        self._epoch += 1
+        # Requests after a write must not join a load that started before it
+        self._inflight.clear()
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        self.invalidations += removed
+        return removed
+
+    def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._inflight.clear()
+        self._entries.clear()
+        self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "load_errors": self.load_errors,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class DataVersions:
+    """
+    Version counter per resource collection, bumped on every write.
+    ETags embed a per-process token, so two processes (or a restart) never
+    produce the same tag for different data.
+    """
+
+    def __init__(self) -> None:
+        self._token = secrets.token_hex(4)
+        self._versions: dict[str, int] = {}
+
+    def bump(self, collection: str) -> None:
+        self._versions[collection] = self._versions.get(collection, 0) + 1
+
+    def etag(self, collection: str) -> str:
+        return f'"{collection}-{self._token}-{self._versions.get(collection, 0)}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if an If-None-Match header value covers etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+response_cache = ResponseCache()
+data_versions = DataVersions()
@@ -0,0 +1,225 @@
+"""Negotiated gzip/brotli response compression, including per-event flushed SSE"""
+from __future__ import annotations
+
+import hashlib
+import os
+import zlib
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "500"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+COMPRESS_EVENT_STREAMS = os.getenv("COMPRESS_EVENT_STREAMS", "true").lower() == "true"
+
+# Compressed bodies kept per (encoding, content digest), so each data version
+# is compressed once no matter how many clients fetch it
+COMPRESSED_CACHE_MAX_ENTRIES = int(os.getenv("COMPRESSED_CACHE_MAX_ENTRIES", "256"))
+
+_COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+compression_metrics = {
+    "compressed": 0,
+    "cache_hits": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "streams": 0,
+}
+_compressed_cache: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick br or gzip from an Accept-Encoding header (highest q wins, br on ties)."""
+    best: str | None = None
+    best_q = 0.0
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name == "br" and brotli is None:
+            continue
+        if name in ("br", "gzip") and (q > best_q or (q == best_q and name == "br")):
+            best, best_q = name, q
+    return best
+
+
+def _gzip_compressor(wbits: int = 31, mem_level: int = 8):
+    return zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, wbits, mem_level)
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    """Compress a complete body, reusing the result for identical content."""
+    key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+    cached = _compressed_cache.get(key)
+    if cached is not None:
+        _compressed_cache.move_to_end(key)
+        compression_metrics["cache_hits"] += 1
+        return cached
+
+    if encoding == "br":
+        compressed = brotli.compress(body, quality=BROTLI_QUALITY)
+    else:
+        compressor = _gzip_compressor()
+        compressed = compressor.compress(body) + compressor.flush()
+
+    _compressed_cache[key] = compressed
+    if len(_compressed_cache) > COMPRESSED_CACHE_MAX_ENTRIES:
+        _compressed_cache.popitem(last=False)
+    compression_metrics["compressed"] += 1
+    compression_metrics["bytes_in"] += len(body)
+    compression_metrics["bytes_out"] += len(compressed)
+    return compressed
+
+
+def compression_stats() -> dict:
+    return {**compression_metrics, "cached_bodies": len(_compressed_cache), "brotli": brotli is not None}
+
+
+class _StreamCompressor:
+    """
+    Incremental compressor for streamed bodies. With flush_each_chunk every
+    chunk (one SSE event) is emitted immediately via a sync flush, so the
+    client can decode it without waiting for the next one.
+    """
+
+    def __init__(self, encoding: str, flush_each_chunk: bool) -> None:
+        self.flush_each_chunk = flush_each_chunk
+        if encoding == "br":
+            # Small window: one compressor lives as long as the connection
+            self._br = brotli.Compressor(quality=BROTLI_QUALITY, lgwin=16)
+            self._gz = None
+        else:
+            # 4 KB window and low memLevel keep per-connection memory around 32 KB
+            self._br = None
+            self._gz = _gzip_compressor(wbits=16 + 12, mem_level=5)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self._br is not None:
+            out = self._br.process(chunk)
+            return out + self._br.flush() if self.flush_each_chunk else out
+        out = self._gz.compress(chunk)
+        return out + self._gz.flush(zlib.Z_SYNC_FLUSH) if self.flush_each_chunk else out
+
+    def finish(self) -> bytes:
+        if self._br is not None:
+            return self._br.finish()
+        return self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware (no buffering of streamed responses). Complete bodies
+    go through compress_body() and its cache; streamed bodies, including
+    Server-Sent Events, get a per-connection compressor.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.app(scope, receive, _CompressingSend(send, encoding, self.minimum_size))
+
+
+class _CompressingSend:
+    def __init__(self, send, encoding: str, minimum_size: int) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self._start: dict | None = None
+        self._mode: str | None = None  # "passthrough", "whole" or "stream"
+        self._compressor: _StreamCompressor | None = None
+
+    async def __call__(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self._start = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._mode is None:
+            self._mode = self._choose_mode(body, more_body)
+            if self._mode == "whole":
+                await self._send_whole(body)
+                return
+            if self._mode == "stream":
+                await self._send(self._start_message(content_length=None))
+            else:
+                await self._send(self._start)
+
+        if self._mode == "stream":
+            out = self._compressor.compress(body) if body else b""
+            if not more_body:
+                out += self._compressor.finish()
+            if out or not more_body:
+                await self._send({"type": "http.response.body", "body": out, "more_body": more_body})
+        else:
+            await self._send(message)
+
+    def _choose_mode(self, body: bytes, more_body: bool) -> str:
+        headers = {k.lower(): v for k, v in self._start["headers"]}
+        if b"content-encoding" in headers:
+            return "passthrough"
+        content_type = headers.get(b"content-type", b"").decode("latin-1").lower()
+        if content_type.startswith("text/event-stream"):
+            if not COMPRESS_EVENT_STREAMS:
+                return "passthrough"
+            self._compressor = _StreamCompressor(self.encoding, flush_each_chunk=True)
+            compression_metrics["streams"] += 1
+            return "stream"
+        if not content_type.startswith(_COMPRESSIBLE_TYPES):
+            return "passthrough"
+        if more_body:
+            self._compressor = _StreamCompressor(self.encoding, flush_each_chunk=False)
+            compression_metrics["streams"] += 1
+            return "stream"
+        return "whole" if len(body) >= self.minimum_size else "passthrough"
+
+    async def _send_whole(self, body: bytes) -> None:
+        compressed = compress_body(body, self.encoding)
+        await self._send(self._start_message(content_length=len(compressed)))
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _start_message(self, content_length: int | None) -> dict:
+        headers = []
+        for name, value in self._start["headers"]:
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and not value.startswith(b"W/"):
+                # The compressed body is not byte-identical, so the tag becomes weak
+                value = b"W/" + value
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return {**self._start, "headers": headers}
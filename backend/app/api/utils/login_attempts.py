@@ -0,0 +1,178 @@
+"""Failed-login tracking for login backoff, in memory or shared through SQLite"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+FAILED_LOGIN_WINDOW_SECONDS = float(os.getenv("FAILED_LOGIN_WINDOW_SECONDS", "300"))
+# Oldest keys are dropped beyond this, so a burst from many IPs cannot grow state without bound
+FAILED_LOGIN_MAX_ENTRIES = int(os.getenv("FAILED_LOGIN_MAX_ENTRIES", "10000"))
+
+
+class FailedLoginTracker(abc.ABC):
+    """
+    Counts failed logins per key (client IP) within a fixed window that starts
+    at the first failure. Subclasses implement _record() and _reset().
+    """
+
+    def __init__(self, window: float, max_entries: int) -> None:
+        self.window = window
+        self.max_entries = max_entries
+        self.failures = 0
+        self.evictions = 0
+
+    async def record_failure(self, key: str) -> int:
+        """Record a failure and return the key's count in the current window."""
+        self.failures += 1
+        return await self._record(key, time.time())
+
+    async def reset(self, key: str) -> None:
+        await self._reset(key)
+
+    @abc.abstractmethod
+    async def _record(self, key: str, now: float) -> int:
+        """Count a failure at now and return the key's count in its window."""
+
+    @abc.abstractmethod
+    async def _reset(self, key: str) -> None:
+        """Forget the key's failures."""
+
+    def stats(self) -> dict:
+        return {"backend": type(self).__name__, "failures": self.failures, "evictions": self.evictions}
+
+
+class MemoryFailedLoginTracker(FailedLoginTracker):
+    """
+    Per-process tracker. Entries are kept in first-failure order, so expired
+    ones are always at the front and expiry pops them off in amortised O(1)
+    instead of scanning every key on each attempt.
+    """
+
+    def __init__(self, window: float, max_entries: int) -> None:
+        super().__init__(window, max_entries)
+        self._entries: OrderedDict[str, tuple[int, float]] = OrderedDict()
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window
+        while self._entries:
+            key, (_count, first_ts) = next(iter(self._entries.items()))
+            if first_ts > cutoff:
+                break
+            del self._entries[key]
+
+    async def _record(self, key: str, now: float) -> int:
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            count = 1
+            self._entries[key] = (count, now)  # Newest first failure goes last
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            count = entry[0] + 1
+            self._entries[key] = (count, entry[1])  # Keeps its position
+        return count
+
+    async def _reset(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "entries": len(self._entries)}
+
+
+class SqliteFailedLoginTracker(FailedLoginTracker):
+    """
+    Tracker in a local SQLite file, shared by every uvicorn worker on the host
+    so they enforce one limit. Queries run in a thread and use the first_ts
+    index for expiry.
+    """
+
+    # Enforce max_entries every this many inserts (it needs a COUNT)
+    TRIM_EVERY = 100
+
+    def __init__(self, path: str, window: float, max_entries: int) -> None:
+        super().__init__(window, max_entries)
+        self.path = path
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._inserts = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS failed_logins "
+                "(key TEXT PRIMARY KEY, count INTEGER NOT NULL, first_ts REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS failed_logins_first_ts ON failed_logins (first_ts)")
+            self._conn = conn
+        return self._conn
+
+    def _record_sync(self, key: str, now: float) -> int:
+        cutoff = now - self.window
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")  # Serializes workers; waits up to the connect timeout
+            try:
+                conn.execute("DELETE FROM failed_logins WHERE first_ts <= ?", (cutoff,))
+                conn.execute(
+                    "INSERT INTO failed_logins (key, count, first_ts) VALUES (?, 1, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET count = count + 1",
+                    (key, now),
+                )
+                count = conn.execute("SELECT count FROM failed_logins WHERE key = ?", (key,)).fetchone()[0]
+                if count == 1:
+                    self._inserts += 1
+                    if self._inserts % self.TRIM_EVERY == 0:
+                        self._trim(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return count
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COUNT(*) FROM failed_logins").fetchone()[0]
+        excess = total - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM failed_logins WHERE key IN "
+                "(SELECT key FROM failed_logins ORDER BY first_ts LIMIT ?)",
+                (excess,),
+            )
+            self.evictions += excess
+
+    def _reset_sync(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM failed_logins WHERE key = ?", (key,))
+
+    async def _record(self, key: str, now: float) -> int:
+        return await asyncio.to_thread(self._record_sync, key, now)
+
+    async def _reset(self, key: str) -> None:
+        await asyncio.to_thread(self._reset_sync, key)
+
+
+def tracker_from_env() -> FailedLoginTracker:
+    """Build the tracker selected by FAILED_LOGIN_BACKEND (default: per-process memory)."""
+    backend = (os.getenv("FAILED_LOGIN_BACKEND") or "memory").lower()
+    if backend == "memory":
+        return MemoryFailedLoginTracker(FAILED_LOGIN_WINDOW_SECONDS, FAILED_LOGIN_MAX_ENTRIES)
+    if backend == "sqlite":
+        path = os.getenv("FAILED_LOGIN_SQLITE_PATH", "/tmp/ghscarnival-failed-logins.sqlite3")
+        return SqliteFailedLoginTracker(path, FAILED_LOGIN_WINDOW_SECONDS, FAILED_LOGIN_MAX_ENTRIES)
+    raise RuntimeError(f"Unknown FAILED_LOGIN_BACKEND: {backend}")
+
+
+failed_logins = tracker_from_env()
@@ -0,0 +1,110 @@
+"""Bounded worker pool for bcrypt, keeping password work off the event loop"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+from fastapi import HTTPException, status
+
+T = TypeVar("T")
+
+# bcrypt releases the GIL while hashing, so threads run in parallel with the loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+# Calls allowed to wait for a worker; beyond this callers get an immediate 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "16"))
+
+
+class PasswordPool:
+    """
+    Runs password hashing/verification in a small thread pool. At most
+    workers + max_queue calls are outstanding; further calls are rejected
+    with 503 instead of queueing without bound behind slow hashes.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: ThreadPoolExecutor | None = None
+        self._outstanding = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_total_ms = 0.0
+        self.queue_wait_max_ms = 0.0
+        self.hash_time_total_ms = 0.0
+        self.hash_time_max_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        return self._executor
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self._outstanding >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        submitted = time.perf_counter()
+        timings: list[float] = []
+
+        def timed() -> T:
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings.extend((started - submitted, time.perf_counter() - started))
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(timed)
+        self._outstanding += 1
+        # Counted until the thread finishes, not until the caller returns: a
+        # cancelled caller (client disconnect) leaves the hash running
+        future.add_done_callback(lambda _: self._call_in_loop(loop, self._done, timings))
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _call_in_loop(loop: asyncio.AbstractEventLoop, fn: Callable[..., None], *args) -> None:
+        try:
+            loop.call_soon_threadsafe(fn, *args)
+        except RuntimeError:
+            pass  # Loop already closed (shutdown)
+
+    def _done(self, timings: list[float]) -> None:
+        self._outstanding -= 1
+        if timings:
+            self._record(timings[0] * 1000, timings[1] * 1000)
+
+    def _record(self, wait_ms: float, hash_ms: float) -> None:
+        self.completed += 1
+        self.queue_wait_total_ms += wait_ms
+        self.queue_wait_max_ms = max(self.queue_wait_max_ms, wait_ms)
+        self.hash_time_total_ms += hash_ms
+        self.hash_time_max_ms = max(self.hash_time_max_ms, hash_ms)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "outstanding": self._outstanding,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait_avg_ms": round(self.queue_wait_total_ms / completed, 2),
+            "queue_wait_max_ms": round(self.queue_wait_max_ms, 2),
+            "hash_time_avg_ms": round(self.hash_time_total_ms / completed, 2),
+            "hash_time_max_ms": round(self.hash_time_max_ms, 2),
+        }
+
+
+password_pool = PasswordPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
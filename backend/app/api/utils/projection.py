@@ -0,0 +1,62 @@
+"""Field projection (fields=) and relation expansion (expand=) for match responses"""
+from __future__ import annotations
+
+from fastapi import HTTPException, status
+
+MATCH_FIELDS = (
+    "id", "sportId", "teamA", "teamB", "status", "startTime",
+    "venue", "score", "createdAt", "updatedAt",
+)
+MATCH_RELATIONS = ("sport",)
+
+
+class MatchProjection:
+    """
+    Shape of a match in a response. With no fields= the full match is returned
+    (sport included, as before); with fields= only those columns plus id are
+    kept, and the sport relation only if expand=sport is also given.
+    """
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: tuple[str, ...] | None) -> None:
+        self.fields = fields
+
+    @classmethod
+    def from_query(cls, fields: str | None, expand: str | None) -> "MatchProjection":
+        expanded = _split(expand)
+        unknown = [name for name in expanded if name not in MATCH_RELATIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown expand value(s): {', '.join(unknown)}. Allowed: {', '.join(MATCH_RELATIONS)}",
+            )
+
+        if not fields:
+            return cls(None)
+
+        requested = _split(fields)
+        unknown = [name for name in requested if name not in MATCH_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(MATCH_FIELDS)}",
+            )
+        selected = ["id"] + [name for name in requested if name != "id"]
+        return cls(tuple(dict.fromkeys(selected + expanded)))
+
+    def apply(self, match: dict) -> dict:
+        if self.fields is None:
+            return match
+        return {name: match[name] for name in self.fields if name in match}
+
+    def apply_all(self, matches: list[dict]) -> list[dict]:
+        if self.fields is None:
+            return matches
+        return [self.apply(match) for match in matches]
+
+
+def _split(value: str | None) -> list[str]:
+    if not value:
+        return []
+    return [part.strip() for part in value.split(",") if part.strip()]
@@ -0,0 +1,92 @@
+"""JSON responses that skip FastAPI's jsonable_encoder pass"""
+from __future__ import annotations
+
+import functools
+import inspect
+import typing
+from typing import Any, Callable
+
+from fastapi import Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+
+from app.api.utils.serialization import encode_json
+
+_SUB_RESPONSE_PARAM = "_fast_json_sub_response"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with encode_json (orjson, or pydantic_core for Prisma models)."""
+
+    def render(self, content: Any) -> bytes:
+        return encode_json(content)
+
+
+def _to_response(result: Any, sub_response: Response, default_status: int | None) -> Any:
+    if isinstance(result, Response):
+        return result
+    response = FastJSONResponse(result, status_code=sub_response.status_code or default_status or 200)
+    # Carry over headers and cookies the endpoint set on its injected Response
+    response.headers.raw.extend(sub_response.headers.raw)
+    return response
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route class whose endpoints' return values are wrapped in FastJSONResponse.
+
+    FastAPI runs every non-Response return value through validation and
+    jsonable_encoder, which walks each Prisma model field by field. Returning a
+    Response skips that, so the endpoint is wrapped to do exactly that; the
+    original signature (plus the injected Response) is kept for dependency
+    resolution and OpenAPI.
+
+    Skipping validation also skips response_model filtering, so routes that
+    declare a response_model explicitly are left unwrapped and keep FastAPI's
+    usual path.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        response_model = kwargs.get("response_model")
+        if response_model is None or isinstance(response_model, DefaultPlaceholder):
+            endpoint = self._wrap(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _wrap(endpoint: Callable[..., Any], default_status: int | None) -> Callable[..., Any]:
+        # Resolve string annotations here: older FastAPI versions evaluate them
+        # against the wrapper's module instead of the endpoint's
+        hints = typing.get_type_hints(endpoint, include_extras=True)
+        signature = inspect.signature(endpoint)
+        parameters = [p.replace(annotation=hints.get(p.name, p.annotation)) for p in signature.parameters.values()]
+        # FastAPI injects a single Response per endpoint, so reuse the
+        # endpoint's own Response parameter when it declares one
+        own = next((p.name for p in parameters if p.annotation is Response), None)
+        param_name = own or _SUB_RESPONSE_PARAM
+
+        def take_sub_response(kwargs: dict[str, Any]) -> Response:
+            return kwargs[param_name] if own else kwargs.pop(param_name)
+
+        if inspect.iscoroutinefunction(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                sub_response = take_sub_response(kwargs)
+                return _to_response(await endpoint(*args, **kwargs), sub_response, default_status)
+        else:
+            @functools.wraps(endpoint)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                sub_response = take_sub_response(kwargs)
+                return _to_response(endpoint(*args, **kwargs), sub_response, default_status)
+
+        if not own:
+            # The extra keyword-only parameter has to precede **kwargs, if any
+            extra = inspect.Parameter(_SUB_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response)
+            variadic = [p for p in parameters if p.kind == inspect.Parameter.VAR_KEYWORD]
+            regular = [p for p in parameters if p.kind != inspect.Parameter.VAR_KEYWORD]
+            parameters = regular + [extra] + variadic
+        wrapper.__signature__ = signature.replace(
+            parameters=parameters,
+            return_annotation=hints.get("return", signature.return_annotation),
+        )
+        return wrapper
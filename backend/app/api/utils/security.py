@@ -1,8 +1,11 @@
 """Authentication and authorization utilities"""
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -11,7 +14,9 @@ import bcrypt
 from fastapi import Depends, HTTPException, status, Request
 from dotenv import load_dotenv
 
+from app.api.utils.password_pool import password_pool
 from app.db.prisma import prisma
+from app.realtime.bus import ChangeEvent, change_bus
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +31,163 @@ if not SECRET_KEY:
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
+# bcrypt work factor for new hashes (see scripts/calibrate_bcrypt.py). Hashes
+# with a different cost are upgraded on the next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# Resolved users are cached briefly so authenticated writes skip the user lookup.
+# Account changes invalidate entries explicitly (on every worker, via the
+# change bus); the TTL only bounds changes made outside the API.
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "512"))
+
+
+class PrincipalCache:
+    """Bounded LRU of users (with sport) by id, each kept for a short TTL."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[object, float]] = OrderedDict()
+        # Bumped by every invalidation, so a lookup that started before it
+        # cannot store what it read
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str):
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: str, user, generation: int) -> None:
+        if generation != self.generation or self.ttl <= 0:
+            return
+        self._entries[user_id] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str | None = None) -> None:
+        """Drop one user, or everyone when user_id is None."""
+        self.generation += 1
+        self.invalidations += 1
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
+
+# Verified JWT claims, so a token seen before skips the HMAC check and decode
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "1024"))
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified token claims, keyed by a digest of the token (the
+    token itself is never stored). Entries are dropped once the token's exp
+    passes, and per user on account changes.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+        self._by_user: dict[str, set[bytes]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: bytes) -> dict | None:
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        exp = payload.get("exp")
+        if exp is not None and exp <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def set(self, key: bytes, payload: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        user_id = payload.get("sub")
+        if user_id:
+            self._by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: bytes) -> None:
+        payload = self._entries.pop(key, None)
+        if payload is None:
+            return
+        user_id = payload.get("sub")
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
+
+    def invalidate_token(self, token: str) -> None:
+        self.invalidations += 1
+        self._remove(self.key(token))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached token of a user (password or account change)."""
+        self.invalidations += 1
+        for key in list(self._by_user.get(user_id, ())):
+            self._remove(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_ENTRIES)
+
+
+def _invalidate_principal(event: ChangeEvent) -> None:
+    if event.kind == "user":
+        principal_cache.invalidate(event.id)
+        token_cache.invalidate_user(event.id)
+
+
+change_bus.subscribe(_invalidate_principal)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -43,11 +205,30 @@ def get_password_hash(password: str) -> str:
     if isinstance(password, str):
         password = password.encode('utf-8')
     # Generate salt and hash
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password, salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a cost other than BCRYPT_ROUNDS."""
+    # Format: $2b$<cost>$<salt+hash>
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return False
+    return int(parts[2]) != BCRYPT_ROUNDS
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password in the password pool, without blocking the event loop."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash in the password pool, without blocking the event loop."""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -63,10 +244,15 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> dict:
-    """Decode and verify a JWT token."""
+    """Decode and verify a JWT token (verified claims are cached until exp)."""
+    key = token_cache.key(token)
+    cached = token_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        token_cache.set(key, payload)
+        return dict(payload)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -83,7 +269,8 @@ def decode_token(token: str) -> dict:
 
 async def get_current_user(request: Request):
     """
-    Verify JWT token from cookie and return the user from database.
+    Verify JWT token from cookie and return the user (from the principal
+    cache, or the database on a miss).
     """
     token = request.cookies.get("access_token")
     
@@ -107,7 +294,12 @@ async def get_current_user(request: Request):
             detail="Invalid token payload",
         )
     
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    
     # Fetch user from database
+    generation = principal_cache.generation
     user = await prisma.user.find_unique(
         where={"id": user_id},
         include={"sport": True}
@@ -119,6 +311,7 @@ async def get_current_user(request: Request):
             detail="User not found",
         )
     
+    principal_cache.set(user_id, user, generation)
     return user
 
 
@@ -0,0 +1,47 @@
+"""Fast JSON encoding helpers shared by responses and live streams"""
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any
+
+import pydantic_core
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder if orjson is not installed
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    """Encode obj to compact JSON bytes (orjson when available)."""
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def content_digest(obj: Any) -> str:
+    """Stable digest of obj's canonical JSON, for change detection and ETags."""
+    return hashlib.blake2b(dumps(obj, sort_keys=True), digest_size=16).hexdigest()
+
+
+def encode_json(content: Any) -> bytes:
+    """
+    Encode a response body. Plain data goes through orjson; bodies holding
+    Prisma (Pydantic) models are serialized by pydantic_core in Rust, without
+    an intermediate model_dump().
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return pydantic_core.to_json(content)
@@ -0,0 +1,298 @@
+"""In-memory scoreboard: every match, kept in query order and patched on each write"""
+from __future__ import annotations
+
+import asyncio
+import base64
+import bisect
+import heapq
+import json
+import logging
+import os
+
+from app.api.utils.cache import data_versions
+from app.db.prisma import prisma
+from app.realtime.bus import ChangeEvent, change_bus
+
+logger = logging.getLogger(__name__)
+
+# How often the snapshot is checked against the DB to catch writes made outside the API
+SCOREBOARD_RECONCILE_SECONDS = float(os.getenv("SCOREBOARD_RECONCILE_SECONDS", "60"))
+SCOREBOARD_LOAD_ATTEMPTS = 5
+
+# Postgres sorts enums in declaration order, so `order status asc` gives this
+STATUS_ORDER = ("UPCOMING", "LIVE", "COMPLETED")
+
+
+def _sort_key(match) -> tuple[float, str]:
+    # updatedAt desc; id breaks ties so ordering is stable
+    return (-match.updatedAt.timestamp(), match.id)
+
+
+# A position in the listing order: (status, sort key of the last match returned)
+Cursor = tuple[str, tuple[float, str]]
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Opaque, URL-safe form of a listing position."""
+    status, (neg_updated, match_id) = cursor
+    raw = json.dumps([status, neg_updated, match_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """Inverse of encode_cursor. Raises ValueError for anything it did not produce."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        status, neg_updated, match_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if status not in STATUS_ORDER or not isinstance(neg_updated, (int, float)) or not isinstance(match_id, str):
+        raise ValueError("Invalid cursor")
+    return status, (float(neg_updated), match_id)
+
+
+def _tail(bucket: list[tuple[float, str]], after: tuple[float, str] | None):
+    start = 0 if after is None else bisect.bisect_right(bucket, after)
+    return (bucket[i] for i in range(start, len(bucket)))
+
+
+class Scoreboard:
+    """
+    Holds every match as JSON-ready dicts (sport included), bucketed by
+    (sportId, status), each bucket ordered by updatedAt desc. Listing matches
+    is a merge of the relevant buckets, matching
+    order=[{"status": "asc"}, {"updatedAt": "desc"}] without a DB query.
+
+    admin.py patches it in place after each write. Writes made on other
+    workers arrive as remote change events; the match is re-read and the
+    event is re-published locally so listeners only see it once it is applied.
+    """
+
+    def __init__(self) -> None:
+        self._matches: dict[str, dict] = {}
+        self._positions: dict[str, tuple[tuple[str, str], tuple[float, str]]] = {}
+        self._buckets: dict[tuple[str, str], list[tuple[float, str]]] = {}
+        self._loaded = False
+        self._writes = 0  # Lets reconcile detect writes that raced its query
+        self._reconciler: asyncio.Task | None = None
+        # The loop only keeps weak references to tasks, so in-flight remote applies live here
+        self._remote_tasks: set[asyncio.Task] = set()
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    # --- building -------------------------------------------------------------------
+
+    async def load(self) -> None:
+        """Replace the snapshot with the current DB state."""
+        async with self._load_lock:
+            for _ in range(SCOREBOARD_LOAD_ATTEMPTS):
+                writes = self._writes
+                matches = await prisma.match.find_many(include={"sport": True})
+                if writes == self._writes:
+                    break
+                # A write landed mid-query; rebuilding now would undo it
+            else:
+                logger.warning("Scoreboard load kept racing writes; the next reconcile pass repairs any drift")
+            self._rebuild(matches)
+            logger.info(f"Scoreboard loaded {len(matches)} matches")
+
+    async def ensure_loaded(self) -> None:
+        if not self._loaded:
+            await self.load()
+
+    def _rebuild(self, matches) -> None:
+        self._matches = {}
+        self._positions = {}
+        self._buckets = {}
+        for match in matches:
+            self._insert(match)
+        for bucket in self._buckets.values():
+            bucket.sort()
+        self._loaded = True
+        data_versions.bump("matches")
+
+    def _insert(self, match, keep_sorted: bool = False) -> None:
+        data = match.model_dump(mode='json')
+        bucket_key = (match.sportId, data["status"])
+        sort_key = _sort_key(match)
+        bucket = self._buckets.setdefault(bucket_key, [])
+        if keep_sorted:
+            bisect.insort(bucket, sort_key)
+        else:
+            bucket.append(sort_key)
+        self._positions[match.id] = (bucket_key, sort_key)
+        self._matches[match.id] = data
+
+    def _discard(self, match_id: str) -> bool:
+        position = self._positions.pop(match_id, None)
+        if position is None:
+            return False
+        bucket_key, sort_key = position
+        bucket = self._buckets[bucket_key]
+        index = bisect.bisect_left(bucket, sort_key)
+        if index < len(bucket) and bucket[index] == sort_key:
+            del bucket[index]
+        if not bucket:
+            del self._buckets[bucket_key]
+        del self._matches[match_id]
+        return True
+
+    # --- patching -------------------------------------------------------------------
+
+    def upsert(self, match) -> bool:
+        """
+        Insert or replace a match (loaded with include={"sport": True}).
+        A row older than the stored one (a late re-read) is ignored; returns
+        whether the snapshot changed.
+        """
+        position = self._positions.get(match.id)
+        if position is not None and _sort_key(match)[0] > position[1][0]:
+            return False  # Keys hold -updatedAt, so a larger key is an older row
+        self._discard(match.id)
+        self._insert(match, keep_sorted=True)
+        self._writes += 1
+        data_versions.bump("matches")
+        return True
+
+    def remove(self, match_id: str) -> None:
+        if self._discard(match_id):
+            self._writes += 1
+            data_versions.bump("matches")
+
+    # --- reads ----------------------------------------------------------------------
+
+    def get(self, match_id: str) -> dict | None:
+        return self._matches.get(match_id)
+
+    def list(
+        self,
+        sport_id: str | None = None,
+        statuses: list[str] | tuple[str, ...] | None = None,
+        limit: int | None = None,
+    ) -> list[dict]:
+        """Matches ordered by status asc, then updatedAt desc."""
+        items, _ = self.page(sport_id, statuses, limit)
+        return items
+
+    def page(
+        self,
+        sport_id: str | None = None,
+        statuses: list[str] | tuple[str, ...] | None = None,
+        limit: int | None = None,
+        after: Cursor | None = None,
+    ) -> tuple[list[dict], Cursor | None]:
+        """
+        Keyset page in (status, updatedAt desc, id) order, starting after the
+        given position. Each bucket is entered with a bisect, so deep pages cost
+        the same as the first. Returns the items and the cursor for the next
+        page (None on the last page).
+        """
+        wanted = [s for s in STATUS_ORDER if statuses is None or s in statuses]
+        if after is not None:
+            after_status, after_key = after
+            wanted = [s for s in wanted if STATUS_ORDER.index(s) >= STATUS_ORDER.index(after_status)]
+
+        items: list[dict] = []
+        last: Cursor | None = None
+        for status in wanted:
+            start_after = after_key if after is not None and status == after_status else None
+            buckets = [
+                bucket for (bucket_sport, bucket_status), bucket in self._buckets.items()
+                if bucket_status == status and (sport_id is None or bucket_sport == sport_id)
+            ]
+            for sort_key in heapq.merge(*(_tail(bucket, start_after) for bucket in buckets)):
+                if limit is not None and len(items) >= limit:
+                    return items, last
+                items.append(self._matches[sort_key[1]])
+                last = (status, sort_key)
+        return items, None
+
+    # --- remote writes and reconciliation -------------------------------------------
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        if event.kind == "match" and event.remote:
+            task = asyncio.create_task(self._apply_remote(event))
+            self._remote_tasks.add(task)
+            task.add_done_callback(self._remote_done)
+
+    def _remote_done(self, task: asyncio.Task) -> None:
+        self._remote_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Scoreboard failed to apply a remote change: {task.exception()!r}")
+
+    async def _apply_remote(self, event: ChangeEvent) -> None:
+        try:
+            match = await prisma.match.find_unique(where={"id": event.id}, include={"sport": True})
+        except Exception as e:
+            # The next reconcile pass picks the change up
+            logger.warning(f"Scoreboard could not load remote change for match {event.id}: {e}")
+            return
+        if match is None:
+            self.remove(event.id)
+        elif not self.upsert(match):
+            return  # A newer version of this match is already applied
+        change_bus.publish_local(ChangeEvent(event.kind, event.action, event.id, event.sport_id))
+
+    async def reconcile(self) -> int:
+        """Compare the snapshot with the DB and repair any drift. Returns the number of fixed matches."""
+        writes = self._writes
+        matches = await prisma.match.find_many(include={"sport": True})
+        if writes != self._writes:
+            return 0  # A write landed mid-query; check again next pass
+
+        fresh = {match.id: match for match in matches}
+        changed = [
+            match for match_id, match in fresh.items()
+            if self._matches.get(match_id) != match.model_dump(mode='json')
+        ]
+        removed = [match_id for match_id in self._matches if match_id not in fresh]
+        if not changed and not removed:
+            return 0
+
+        logger.warning(f"Scoreboard drift: {len(changed)} changed, {len(removed)} removed; repairing")
+        old_sports = {match_id: m["sportId"] for match_id, m in self._matches.items()}
+        self._rebuild(matches)
+        for match in changed:
+            change_bus.publish_local(ChangeEvent("match", "update", match.id, match.sportId))
+        for match_id in removed:
+            change_bus.publish_local(ChangeEvent("match", "delete", match_id, old_sports[match_id]))
+        return len(changed) + len(removed)
+
+    async def _reconcile_forever(self) -> None:
+        while True:
+            await asyncio.sleep(SCOREBOARD_RECONCILE_SECONDS)
+            try:
+                if self._loaded:
+                    await self.reconcile()
+                else:
+                    await self.load()
+            except Exception as e:
+                logger.error(f"Scoreboard reconcile failed: {e}")
+
+    def start(self) -> None:
+        change_bus.subscribe(self._on_change)
+        if self._reconciler is None or self._reconciler.done():
+            self._reconciler = asyncio.create_task(self._reconcile_forever())
+
+    def stop(self) -> None:
+        change_bus.unsubscribe(self._on_change)
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            self._reconciler = None
+        for task in self._remote_tasks:
+            task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self._loaded,
+            "matches": len(self._matches),
+            "buckets": len(self._buckets),
+            "writes": self._writes,
+            "remote_pending": len(self._remote_tasks),
+        }
+
+
+scoreboard = Scoreboard()
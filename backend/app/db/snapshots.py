@@ -0,0 +1,214 @@
+"""Static JSON snapshots of the hot public documents, for StaticFiles or a CDN"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.api.utils.serialization import content_digest, dumps
+from app.db.prisma import prisma
+from app.db.scoreboard import scoreboard
+from app.db.sport_registry import sport_registry
+from app.realtime.bus import ChangeEvent, change_bus
+
+logger = logging.getLogger(__name__)
+
+# Unset disables the exporter
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "60"))
+# Admin writes trigger an export after this delay, so a burst of score updates
+# produces one export instead of one per write
+SNAPSHOT_DEBOUNCE_SECONDS = float(os.getenv("SNAPSHOT_DEBOUNCE_SECONDS", "2"))
+SNAPSHOT_KEEP_VERSIONS = int(os.getenv("SNAPSHOT_KEEP_VERSIONS", "5"))
+# Mount the directory at /snapshots on the API itself
+SNAPSHOT_SERVE = os.getenv("SNAPSHOT_SERVE", "true").lower() == "true"
+
+SNAPSHOT_MATCH_LIMIT = 200
+
+
+class SnapshotExporter:
+    """
+    Writes sports, live/upcoming matches and pinned announcements as JSON files.
+
+    Each document is written as {name}.{digest}.json plus a .gz copy; the
+    digest-named files never change, so they can be cached forever. {name}.json
+    (and .gz) always hold the latest version, and manifest.json maps each
+    document to its current versioned file. Unchanged documents are not
+    rewritten, and every write is atomic (temp file + rename).
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory) if directory else None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._dirty = False
+        self._lock = asyncio.Lock()
+        self.exports = 0
+        self.files_written = 0
+        self.failures = 0
+        self.last_export_at: float | None = None
+        self.last_duration_ms: float | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    async def _documents(self) -> dict[str, dict]:
+        await scoreboard.ensure_loaded()
+        announcements = await prisma.announcement.find_many(
+            where={"pinned": True},
+            order={"updatedAt": "desc"}
+        )
+        return {
+            "sports": {"items": await sport_registry.items()},
+            "matches": {
+                "items": scoreboard.list(statuses=("LIVE", "UPCOMING"), limit=SNAPSHOT_MATCH_LIMIT)
+            },
+            "announcements": {"items": [a.model_dump(mode='json') for a in announcements]},
+        }
+
+    async def export(self) -> None:
+        """Export every document now (serialized with any export already running)."""
+        if not self.enabled:
+            return
+        async with self._lock:
+            started = time.perf_counter()
+            documents = await self._documents()
+            generated_at = datetime.now(timezone.utc).isoformat()
+            written = await asyncio.to_thread(self._write_all, documents, generated_at)
+            self.exports += 1
+            self.files_written += written
+            self.last_export_at = time.time()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            if written:
+                logger.info(f"Snapshot export wrote {written} files in {self.last_duration_ms} ms")
+
+    def _write_all(self, documents: dict[str, dict], generated_at: str) -> int:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.directory / "manifest.json"
+        try:
+            previous = json.loads(manifest_path.read_bytes())["documents"]
+        except (OSError, ValueError, KeyError):
+            previous = {}
+
+        written = 0
+        manifest = {"generatedAt": generated_at, "documents": {}}
+        for name, document in documents.items():
+            body = dumps(document)
+            version = content_digest(document)[:16]
+            versioned = f"{name}.{version}.json"
+            manifest["documents"][name] = {
+                "path": versioned,
+                "gzip": f"{versioned}.gz",
+                "version": version,
+                "bytes": len(body),
+            }
+            if previous.get(name, {}).get("version") == version and (self.directory / versioned).exists():
+                continue
+
+            # mtime=0 keeps the gzip bytes identical across workers and runs
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            for filename, data in (
+                (versioned, body),
+                (f"{versioned}.gz", compressed),
+                (f"{name}.json", body),
+                (f"{name}.json.gz", compressed),
+            ):
+                self._write_atomic(filename, data)
+                written += 1
+            self._prune(name)
+
+        if written or not previous:
+            self._write_atomic("manifest.json", json.dumps(manifest, indent=2).encode("utf-8"))
+            written += 1
+        return written
+
+    def _write_atomic(self, filename: str, data: bytes) -> None:
+        target = self.directory / filename
+        temp = target.with_name(f".{filename}.{os.getpid()}.tmp")
+        temp.write_bytes(data)
+        os.replace(temp, target)
+
+    def _prune(self, name: str) -> None:
+        versions = sorted(
+            self.directory.glob(f"{name}.*.json"),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for old in versions[SNAPSHOT_KEEP_VERSIONS:]:
+            old.unlink(missing_ok=True)
+            old.with_name(f"{old.name}.gz").unlink(missing_ok=True)
+
+    # --- triggers ----------------------------------------------------------------
+
+    def request_export(self, delay: float = SNAPSHOT_DEBOUNCE_SECONDS) -> None:
+        """Schedule an export after delay; requests made meanwhile are merged."""
+        if not self.enabled or self._loop is None:
+            return
+        if self._task is not None and not self._task.done():
+            self._dirty = True  # Run once more when the current export finishes
+            return
+        if self._pending is None:
+            self._pending = self._loop.call_later(delay, self._run)
+
+    def request_export_threadsafe(self) -> None:
+        """Entry point for the BackgroundScheduler, which runs jobs in a worker thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self.request_export, 0)
+
+    def _run(self) -> None:
+        self._pending = None
+        self._dirty = False
+        self._task = asyncio.create_task(self._export_logged())
+
+    async def _export_logged(self) -> None:
+        try:
+            await self.export()
+        except Exception as e:
+            self.failures += 1
+            logger.error(f"Snapshot export failed: {e}")
+        if self._dirty:
+            self._dirty = False
+            self._task = None
+            self.request_export()
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        if event.kind not in ("match", "announcement"):
+            return
+        # Remote match changes come back as local events once the scoreboard has them
+        if event.kind == "match" and event.remote:
+            return
+        self.request_export()
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        self._loop = asyncio.get_running_loop()
+        change_bus.subscribe(self._on_change)
+        self.request_export(0)
+
+    def stop(self) -> None:
+        change_bus.unsubscribe(self._on_change)
+        if self._pending is not None:
+            self._pending.cancel()
+            self._pending = None
+        self._loop = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "exports": self.exports,
+            "files_written": self.files_written,
+            "failures": self.failures,
+            "last_export_at": self.last_export_at,
+            "last_duration_ms": self.last_duration_ms,
+        }
+
+
+snapshot_exporter = SnapshotExporter(SNAPSHOT_DIR)
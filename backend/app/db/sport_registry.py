@@ -0,0 +1,98 @@
+"""In-memory index of sports by slug and id, loaded at startup"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+
+from app.api.utils.cache import data_versions
+from app.api.utils.serialization import content_digest
+from app.db.prisma import prisma
+
+logger = logging.getLogger(__name__)
+
+# Sports are only added through seed scripts or Prisma Studio, so a reload is
+# triggered by an unknown slug/id (at most this often) or by age.
+SPORT_REGISTRY_MISS_RELOAD_SECONDS = float(os.getenv("SPORT_REGISTRY_MISS_RELOAD_SECONDS", "30"))
+SPORT_REGISTRY_MAX_AGE_SECONDS = float(os.getenv("SPORT_REGISTRY_MAX_AGE_SECONDS", "300"))
+
+
+class SportRegistry:
+    """
+    Every sport, held in memory so that slug/id resolution and the sports
+    endpoints never need a DB round trip.
+    """
+
+    def __init__(self) -> None:
+        self._by_slug: dict = {}
+        self._by_id: dict = {}
+        self._items: list[dict] = []  # JSON-ready, ordered by name
+        self._digest: str | None = None
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._refresh: asyncio.Task | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    async def load(self) -> None:
+        """(Re)load all sports. Concurrent callers share one query."""
+        started = time.monotonic()
+        async with self._lock:
+            if self._loaded_at is not None and self._loaded_at >= started:
+                return  # Someone else reloaded while we waited
+            sports = await prisma.sport.find_many(order={"name": "asc"})
+            items = [sport.model_dump(mode='json') for sport in sports]
+            self._by_slug = {sport.slug: sport for sport in sports}
+            self._by_id = {sport.id: sport for sport in sports}
+            self._items = items
+            self._loaded_at = time.monotonic()
+
+            digest = content_digest(items)
+            if digest != self._digest:
+                self._digest = digest
+                data_versions.bump("sports")
+                logger.info(f"Sport registry loaded {len(sports)} sports")
+
+    async def _ensure_fresh(self) -> None:
+        if self._loaded_at is None:
+            await self.load()
+        elif time.monotonic() - self._loaded_at > SPORT_REGISTRY_MAX_AGE_SECONDS:
+            # Stale-while-revalidate: keep serving while one background reload runs
+            if self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.create_task(self._background_load())
+
+    async def _background_load(self) -> None:
+        try:
+            await self.load()
+        except Exception as e:
+            logger.warning(f"Sport registry refresh failed: {e}")
+
+    async def _reload_on_miss(self) -> bool:
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < SPORT_REGISTRY_MISS_RELOAD_SECONDS:
+            return False
+        await self.load()
+        return True
+
+    async def items(self) -> list[dict]:
+        await self._ensure_fresh()
+        return self._items
+
+    async def by_slug(self, slug: str):
+        await self._ensure_fresh()
+        sport = self._by_slug.get(slug)
+        if sport is None and await self._reload_on_miss():
+            sport = self._by_slug.get(slug)
+        return sport
+
+    async def by_id(self, sport_id: str):
+        await self._ensure_fresh()
+        sport = self._by_id.get(sport_id)
+        if sport is None and await self._reload_on_miss():
+            sport = self._by_id.get(sport_id)
+        return sport
+
+
+sport_registry = SportRegistry()
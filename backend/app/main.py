@@ -9,6 +9,7 @@ from dotenv import load_dotenv
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
 from apscheduler.schedulers.background import BackgroundScheduler
 
 if __package__ is None or __package__ == "":
@@ -16,7 +17,15 @@ if __package__ is None or __package__ == "":
     sys.path.insert(0, str(backend_root))
 
 from app.api.main import api_router  # noqa: E402
+from app.api.utils.compression import CompressionMiddleware  # noqa: E402
+from app.api.utils.password_pool import password_pool  # noqa: E402
 from app.db.prisma import connect_prisma, disconnect_prisma  # noqa: E402
+from app.db.scoreboard import scoreboard  # noqa: E402
+from app.db.snapshots import SNAPSHOT_INTERVAL_SECONDS, SNAPSHOT_SERVE, snapshot_exporter  # noqa: E402
+from app.db.sport_registry import sport_registry  # noqa: E402
+from app.realtime.bus import change_bus  # noqa: E402
+from app.realtime.limits import RequestTaskMiddleware, stream_limiter  # noqa: E402
+from app.realtime.transports import transport_from_env  # noqa: E402
 
 load_dotenv()
 
@@ -35,6 +44,15 @@ def keep_alive_task():
 
 # Schedule keep-alive task every 10 minutes
 scheduler.add_job(keep_alive_task, 'interval', minutes=10, id='keep_alive')
+
+# Periodic static snapshot export (also triggered by admin writes)
+if snapshot_exporter.enabled:
+    scheduler.add_job(
+        snapshot_exporter.request_export_threadsafe,
+        'interval',
+        seconds=SNAPSHOT_INTERVAL_SECONDS,
+        id='snapshot_export'
+    )
 scheduler.start()
 
 # CORS configuration
@@ -50,6 +68,9 @@ app.add_middleware(
     expose_headers=["Set-Cookie"],  # Expose cookie headers for better iOS compatibility
 )
 
+# gzip/brotli for JSON and per-event flushed gzip/brotli for live streams
+app.add_middleware(CompressionMiddleware)
+
 
 @app.middleware("http")
 async def add_security_headers(request, call_next):
@@ -62,14 +83,38 @@ async def add_security_headers(request, call_next):
     return response
 
 
+# Added last so it wraps every other middleware and runs in the server's own
+# request task, which the stream reaper cancels for clients that stopped reading
+app.add_middleware(RequestTaskMiddleware)
+
+
 @app.on_event("startup")
 async def on_startup() -> None:
     await connect_prisma()
+    try:
+        await sport_registry.load()
+    except Exception as e:
+        # Not fatal: the registry loads lazily on first use
+        logger.error(f"Failed to load sport registry: {e}")
+    try:
+        await scoreboard.load()
+    except Exception as e:
+        # Not fatal: the scoreboard loads on first read or the next reconcile pass
+        logger.error(f"Failed to load scoreboard: {e}")
+    scoreboard.start()
+    await change_bus.start(transport_from_env())
+    stream_limiter.start_reaper()
+    snapshot_exporter.start()
 
 
 @app.on_event("shutdown")
 async def on_shutdown() -> None:
+    snapshot_exporter.stop()
+    stream_limiter.stop_reaper()
+    scoreboard.stop()
+    await change_bus.stop()
     await disconnect_prisma()
+    password_pool.shutdown()
     scheduler.shutdown()
 
 
@@ -81,3 +126,8 @@ async def root():
 
 
 app.include_router(api_router, prefix="/api")
+
+# Serve exported snapshots directly; a CDN or static host can sync the same directory
+if snapshot_exporter.enabled and SNAPSHOT_SERVE:
+    snapshot_exporter.directory.mkdir(parents=True, exist_ok=True)
+    app.mount("/snapshots", StaticFiles(directory=snapshot_exporter.directory), name="snapshots")
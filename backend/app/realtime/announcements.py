@@ -0,0 +1,96 @@
+"""Shared feed of pinned announcements for WebSocket subscribers"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+
+from app.api.utils.serialization import content_digest
+from app.db.prisma import prisma
+from app.realtime.bus import ChangeEvent, change_bus
+from app.realtime.hub import SAFETY_POLL_SECONDS, sse_frame
+from app.realtime.subscriber import Subscriber, queue_stats
+
+logger = logging.getLogger(__name__)
+
+
+class AnnouncementFeed:
+    """
+    Reloads pinned announcements when one changes (or the safety poll elapses)
+    and fans the result out to every subscriber. Runs only while subscribed.
+    """
+
+    def __init__(self) -> None:
+        self.subscribers: set[Subscriber] = set()
+        self.last_frame: bytes | None = None
+        self._last_digest: str | None = None
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        if event.kind == "announcement":
+            self._wake.set()
+
+    def resync_frame(self, sub: Subscriber) -> bytes | None:
+        return self.last_frame
+
+    def subscribe(self) -> Subscriber:
+        sub = Subscriber(self, resync=self.resync_frame)
+        self.subscribers.add(sub)
+        if self.last_frame is not None:
+            sub.offer(self.last_frame)
+        if self._task is None or self._task.done():
+            change_bus.subscribe(self._on_change)
+            self._task = asyncio.create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self.subscribers.discard(sub)
+        if not self.subscribers:
+            change_bus.unsubscribe(self._on_change)
+            if self._task is not None and not self._task.done():
+                self._task.cancel()
+            self._task = None
+            # Nobody is watching, so the cached frame would only go stale
+            self.last_frame = None
+            self._last_digest = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                announcements = await prisma.announcement.find_many(
+                    where={"pinned": True},
+                    order={"updatedAt": "desc"},
+                    take=3
+                )
+                items = [ann.model_dump(mode='json') for ann in announcements]
+                digest = content_digest(items)
+                if digest != self._last_digest:
+                    data = {
+                        "items": items,
+                        "timestamp": datetime.utcnow().isoformat()
+                    }
+                    self.last_frame = sse_frame(data, event="announcements")
+                    self._last_digest = digest
+                    for sub in self.subscribers:
+                        sub.offer(self.last_frame)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Announcement feed poll failed: {e}")
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=SAFETY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self.subscribers),
+            **queue_stats(list(self.subscribers)),
+        }
+
+
+announcement_feed = AnnouncementFeed()
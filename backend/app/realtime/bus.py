@@ -0,0 +1,102 @@
+"""In-process change bus used to push admin writes to live streams"""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from app.realtime.transports import Transport
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    A single data change. kind is "match", "announcement" or "user".
+    remote is set on events that arrived from another worker.
+    """
+
+    kind: str
+    action: str  # create, update or delete
+    id: str
+    sport_id: str | None = None
+    remote: bool = False
+
+
+Listener = Callable[[ChangeEvent], None]
+
+
+class ChangeBus:
+    """
+    Synchronous fan-out of change events to registered listeners.
+    Listeners must be cheap and non-blocking (e.g. set an asyncio.Event).
+
+    With a transport attached (see CHANGE_BUS_BACKEND), published events are
+    also sent to the other worker processes, and their events are delivered
+    to local listeners as if they had been published here.
+    """
+
+    def __init__(self) -> None:
+        self._listeners: list[Listener] = []
+        self._transport: Transport | None = None
+
+    async def start(self, transport: Transport | None) -> None:
+        self._transport = transport
+        if transport is not None:
+            await transport.start(self._dispatch)
+
+    async def stop(self) -> None:
+        if self._transport is not None:
+            await self._transport.stop()
+            self._transport = None
+
+    def subscribe(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            pass
+
+    def publish(self, event: ChangeEvent) -> None:
+        self._dispatch(event)
+        if self._transport is not None:
+            self._transport.send(event)
+
+    def publish_local(self, event: ChangeEvent) -> None:
+        """Deliver to this process's listeners only."""
+        self._dispatch(event)
+
+    def stats(self) -> dict:
+        return {
+            "listeners": len(self._listeners),
+            "transport": self._transport.stats() if self._transport is not None else None,
+        }
+
+    def _dispatch(self, event: ChangeEvent) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Change listener failed for {event}: {e}")
+
+
+change_bus = ChangeBus()
+
+
+def publish_match_change(action: str, match) -> None:
+    """Notify live streams that a match was created, updated or deleted."""
+    change_bus.publish(ChangeEvent("match", action, match.id, match.sportId))
+
+
+def publish_announcement_change(action: str, announcement_id: str) -> None:
+    """Notify live streams that an announcement was created, updated or deleted."""
+    change_bus.publish(ChangeEvent("announcement", action, announcement_id))
+
+
+def publish_user_change(action: str, user_id: str) -> None:
+    """Notify every worker that a user account changed (drops cached principals)."""
+    change_bus.publish(ChangeEvent("user", action, user_id))
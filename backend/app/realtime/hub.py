@@ -0,0 +1,328 @@
+"""Process-wide hub that shares live-stream polling between subscribers"""
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import secrets
+from collections import deque
+from datetime import datetime
+
+from app.api.utils.serialization import content_digest, dumps
+from app.db.prisma import prisma
+from app.db.scoreboard import scoreboard
+from app.db.sport_registry import sport_registry
+from app.realtime.bus import ChangeEvent, change_bus
+from app.realtime.subscriber import Subscriber, queue_stats
+
+logger = logging.getLogger(__name__)
+
+# Streams are refreshed as soon as an admin write is published on the change bus.
+# Polling only remains as a safety net for writes made outside the API.
+SAFETY_POLL_SECONDS = float(os.getenv("LIVE_STREAM_SAFETY_POLL_SECONDS", "30"))
+
+# Number of delta events kept per topic for Last-Event-ID resume
+DELTA_HISTORY_SIZE = int(os.getenv("LIVE_STREAM_DELTA_HISTORY", "256"))
+
+# How long a stopped topic keeps its state after its last subscriber leaves,
+# so reconnecting clients can resume
+TOPIC_LINGER_SECONDS = float(os.getenv("LIVE_STREAM_TOPIC_LINGER_SECONDS", "60"))
+
+# Event IDs are "<epoch>-<seq>": seq is a process-wide counter and epoch a
+# per-process token, so an ID issued by another worker (or before a restart)
+# never falls inside this process's resume window and gets a snapshot instead.
+_EVENT_EPOCH = secrets.token_hex(4)
+_event_ids = itertools.count(1)
+
+
+def sse_frame(data: dict, event: str | None = None, event_id: int | None = None) -> bytes:
+    """
+    Encode a single Server-Sent Events frame.
+    Frames are built once per data version and the same bytes go to every subscriber.
+    """
+    head = b""
+    if event_id is not None:
+        head += b"id: " + format_event_id(event_id).encode("ascii") + b"\n"
+    if event is not None:
+        head += b"event: " + event.encode("utf-8") + b"\n"
+    return head + b"data: " + dumps(data) + b"\n\n"
+
+
+def format_event_id(seq: int) -> str:
+    return f"{_EVENT_EPOCH}-{seq}"
+
+
+def parse_event_id(value: str | None) -> int | None:
+    """Parse a Last-Event-ID header, ignoring anything this process did not issue."""
+    if not value:
+        return None
+    epoch, _, seq = value.strip().partition("-")
+    if epoch != _EVENT_EPOCH:
+        return None
+    try:
+        return int(seq)
+    except ValueError:
+        return None
+
+
+class LiveTopic:
+    """
+    One refresher for a single sport filter (None = all sports).
+    It reloads when a relevant change is published or the safety poll elapses,
+    and every subscriber of the topic receives the same frames.
+
+    Legacy subscribers get the full live/upcoming payload whenever it changes.
+    Delta subscribers get one snapshot, then per-match upsert/remove events.
+    """
+
+    def __init__(self, sport_slug: str | None) -> None:
+        self.sport_slug = sport_slug
+        self.subscribers: set[Subscriber] = set()
+        self.last_frame: bytes | None = None
+        self._last_digest: str | None = None
+        self._sport_id: str | None = None
+        self._task: asyncio.Task | None = None
+        self._wake = asyncio.Event()
+        self._linger: asyncio.TimerHandle | None = None
+
+        # Delta state: current matches keyed by id (in query order)
+        self._matches: dict[str, dict] | None = None
+        self._announcements: list[dict] = []
+        self._seq: int | None = None
+        self._snapshot_frame: bytes | None = None
+        self._history: deque[tuple[int, bytes]] = deque()
+        # Oldest event ID a client can resume from
+        self._resume_floor: int | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            change_bus.subscribe(self._on_change)
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        change_bus.unsubscribe(self._on_change)
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        # Pinned announcements are part of every topic's payload
+        if event.kind == "announcement":
+            self._wake.set()
+        elif event.kind == "match" and not event.remote:
+            # Remote match writes are re-published once the scoreboard has them
+            if self._sport_id is None or event.sport_id == self._sport_id:
+                self._wake.set()
+
+    def _broadcast(self, frame: bytes, deltas: bool | None = None) -> None:
+        for sub in self.subscribers:
+            if deltas is None or sub.deltas == deltas:
+                sub.offer(frame)
+
+    def resync_frame(self, sub: Subscriber) -> bytes | None:
+        """Current full state for a subscriber whose backlog was dropped."""
+        if not sub.deltas:
+            return self.last_frame
+        if self._matches is None:
+            return None
+        return self._snapshot()
+
+    def attach(self, sub: Subscriber, last_event_id: int | None = None) -> None:
+        """Queue whatever a new subscriber needs to catch up."""
+        if not sub.deltas:
+            # Late joiners get the current state right away
+            if self.last_frame is not None:
+                sub.offer(self.last_frame)
+            return
+
+        if self._matches is None:
+            # First load still pending; its snapshot will be broadcast
+            return
+
+        if (
+            last_event_id is not None
+            and self._resume_floor is not None
+            and self._resume_floor <= last_event_id <= self._seq
+        ):
+            for seq, frame in self._history:
+                if seq > last_event_id:
+                    sub.offer(frame)
+            return
+
+        sub.offer(self._snapshot())
+
+    def _snapshot(self) -> bytes:
+        if self._snapshot_frame is None:
+            data = {
+                "matches": list(self._matches.values()),
+                "announcements": self._announcements,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            self._snapshot_frame = sse_frame(data, event="snapshot", event_id=self._seq)
+        return self._snapshot_frame
+
+    def _record_delta(self, event: str, data: dict) -> bytes:
+        self._seq = next(_event_ids)
+        frame = sse_frame(data, event=event, event_id=self._seq)
+        self._history.append((self._seq, frame))
+        if len(self._history) > DELTA_HISTORY_SIZE:
+            evicted_seq, _ = self._history.popleft()
+            self._resume_floor = evicted_seq
+        return frame
+
+    async def _fetch(self) -> tuple[list[dict], list[dict]]:
+        # Slug to id comes from the in-memory registry, not the DB
+        if self.sport_slug and not self._sport_id:
+            sport = await sport_registry.by_slug(self.sport_slug)
+            if sport:
+                self._sport_id = sport.id
+
+        # Live and upcoming matches come from the scoreboard, already JSON-ready
+        await scoreboard.ensure_loaded()
+        matches_data = scoreboard.list(
+            sport_id=self._sport_id,
+            statuses=("LIVE", "UPCOMING"),
+            limit=50  # Limit to reduce payload size
+        )
+
+        # Fetch pinned announcements (less frequently changing data)
+        announcements = await prisma.announcement.find_many(
+            where={"pinned": True},
+            order={"updatedAt": "desc"},
+            take=3
+        )
+
+        announcements_data = [ann.model_dump(mode='json') for ann in announcements]
+        return matches_data, announcements_data
+
+    def _apply(self, matches_data: list[dict], announcements_data: list[dict]) -> None:
+        new_matches = {m["id"]: m for m in matches_data}
+        delta_frames: list[bytes] = []
+        initial = self._matches is None
+
+        if initial:
+            # Initial load: everyone gets a snapshot, nothing to diff against
+            self._seq = next(_event_ids)
+            self._resume_floor = self._seq
+        else:
+            old_matches = self._matches
+            for match_id, match in new_matches.items():
+                if old_matches.get(match_id) != match:
+                    delta_frames.append(self._record_delta("upsert", {"match": match}))
+            for match_id in old_matches.keys() - new_matches.keys():
+                delta_frames.append(self._record_delta("remove", {"id": match_id}))
+            if announcements_data != self._announcements:
+                delta_frames.append(self._record_delta("announcements", {"items": announcements_data}))
+
+        self._matches = new_matches
+        self._announcements = announcements_data
+        if initial or delta_frames:
+            self._snapshot_frame = None
+
+        # Separate live and upcoming matches for legacy subscribers
+        live_matches = [m for m in matches_data if m["status"] == "LIVE"]
+        upcoming_matches = [m for m in matches_data if m["status"] == "UPCOMING"]
+
+        # Digest for change detection (exclude timestamp)
+        data_for_hash = {
+            "live": live_matches[0] if live_matches else None,
+            "upcoming": upcoming_matches,
+            "announcements": announcements_data
+        }
+        digest = content_digest(data_for_hash)
+        legacy_changed = digest != self._last_digest
+        if legacy_changed:
+            data = {
+                **data_for_hash,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+            self.last_frame = sse_frame(data)
+            self._last_digest = digest
+
+        # State is fully updated before fan-out so slow subscribers resync to it
+        if initial:
+            self._broadcast(self._snapshot(), deltas=True)
+        for frame in delta_frames:
+            self._broadcast(frame, deltas=True)
+        if legacy_changed:
+            self._broadcast(self.last_frame, deltas=False)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                matches_data, announcements_data = await self._fetch()
+                self._apply(matches_data, announcements_data)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Live topic poll failed (sport={self.sport_slug}): {e}")
+                error_data = {
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+                self._broadcast(sse_frame(error_data, event="error"))
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=SAFETY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+class LiveHub:
+    """Registry of live topics keyed by sport filter."""
+
+    def __init__(self) -> None:
+        self._topics: dict[str | None, LiveTopic] = {}
+
+    def subscribe(
+        self,
+        sport_slug: str | None,
+        deltas: bool = False,
+        last_event_id: int | None = None,
+    ) -> Subscriber:
+        topic = self._topics.get(sport_slug)
+        if topic is None:
+            topic = LiveTopic(sport_slug)
+            self._topics[sport_slug] = topic
+
+        if topic._linger is not None:
+            topic._linger.cancel()
+            topic._linger = None
+
+        sub = Subscriber(topic, deltas=deltas, resync=topic.resync_frame)
+        topic.subscribers.add(sub)
+        topic.attach(sub, last_event_id)
+        topic.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        topic = sub.topic
+        topic.subscribers.discard(sub)
+        if not topic.subscribers and topic._linger is None:
+            # Stop DB work right away, but keep the topic's delta state around
+            # briefly so reconnects can resume; the next refresh diffs from it.
+            topic.stop()
+            loop = asyncio.get_running_loop()
+            topic._linger = loop.call_later(TOPIC_LINGER_SECONDS, self._expire, topic)
+
+    def _expire(self, topic: LiveTopic) -> None:
+        topic._linger = None
+        if topic.subscribers:
+            return
+        topic.stop()
+        if self._topics.get(topic.sport_slug) is topic:
+            del self._topics[topic.sport_slug]
+
+    def stats(self) -> dict:
+        subscribers = [sub for t in self._topics.values() for sub in t.subscribers]
+        return {
+            "topics": len(self._topics),
+            "subscribers": len(subscribers),
+            **queue_stats(subscribers),
+        }
+
+
+live_hub = LiveHub()
@@ -0,0 +1,240 @@
+"""Caps on concurrent live-stream connections per process and per client IP"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+from fastapi import HTTPException, status
+
+from app.realtime.subscriber import stream_metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_STREAMS_PER_PROCESS = int(os.getenv("LIVE_STREAM_MAX_CONNECTIONS", "5000"))
+# 0 (default) disables the per-IP cap: a whole campus or venue can share one NAT
+# address, so the per-process cap is the real safety valve. Behind a proxy this
+# only works if uvicorn trusts X-Forwarded-For (see SETUP.md).
+MAX_STREAMS_PER_IP = int(os.getenv("LIVE_STREAM_MAX_PER_IP", "0"))
+
+# Streams older than this are closed by the reaper; clients simply reconnect
+MAX_STREAM_LIFETIME_SECONDS = float(os.getenv("LIVE_STREAM_MAX_LIFETIME_SECONDS", "7200"))
+# A stream asked to close (reaped or evicted) that still holds its slot after
+# this long is stuck writing to a client that stopped reading; its request is
+# cancelled and its slot and subscription freed
+STREAM_CLOSE_GRACE_SECONDS = float(os.getenv("LIVE_STREAM_CLOSE_GRACE_SECONDS", "30"))
+REAPER_INTERVAL_SECONDS = 60
+
+
+class _RequestHandle:
+    __slots__ = ("task", "aborted")
+
+    def __init__(self, task: asyncio.Task | None) -> None:
+        self.task = task
+        self.aborted = False
+
+
+_request_handle: ContextVar[_RequestHandle | None] = ContextVar("live_stream_request", default=None)
+
+
+class RequestTaskMiddleware:
+    """
+    Records the server task handling each request, so a stuck live stream can
+    be cancelled as a whole: the stream's own task may be an anyio child that
+    ignores outside cancellation, and the server only drops the connection when
+    its task ends. Must be the outermost middleware.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        handle = _RequestHandle(asyncio.current_task())
+        token = _request_handle.set(handle)
+        try:
+            await self.app(scope, receive, send)
+        except asyncio.CancelledError:
+            if not handle.aborted:
+                raise
+            # Cancelled by the reaper: end quietly, the server closes the connection
+            handle.task.uncancel()
+        finally:
+            _request_handle.reset(token)
+
+
+class StreamLease:
+    """
+    A reserved connection slot. release() is idempotent.
+
+    The stream calls bind() with a closer that ends it gracefully (the reaper
+    uses it once the stream is too old) and the cleanup to run on release. A
+    graceful close only works while the client keeps reading, so closing()
+    starts a grace period after which the reaper calls abort(): the request is
+    cancelled (see RequestTaskMiddleware) and the lease released, which frees
+    the slot and the subscription. The server closes the connection once it
+    has flushed the bytes it already buffered (at most one high-water mark),
+    or when the OS gives up on the peer.
+    """
+
+    def __init__(self, limiter: "ConnectionLimiter", ip: str) -> None:
+        self._limiter = limiter
+        self.ip = ip
+        self.started = time.monotonic()
+        self.closer: Callable[[], None] | None = None
+        self.closing_since: float | None = None
+        self._cleanup: Callable[[], None] | None = None
+        self._handle: _RequestHandle | None = None
+        self._released = False
+
+    def bind(self, closer: Callable[[], None], cleanup: Callable[[], None] | None = None) -> None:
+        """Register the graceful closer, the release cleanup and the request serving this stream."""
+        self.closer = closer
+        self._cleanup = cleanup
+        self._handle = _request_handle.get()
+
+    def closing(self) -> None:
+        """The stream was asked to end; start the grace period."""
+        if self.closing_since is None:
+            self.closing_since = time.monotonic()
+
+    def recovered(self) -> None:
+        """
+        Part of the stream was evicted but the client is reading again (a
+        multiplexed socket drops only the lagging channel), so stop the grace
+        period. Has no effect once the reaper has closed the whole stream.
+        """
+        if self.closer is not None:
+            self.closing_since = None
+
+    def abort(self) -> bool:
+        """Cancel the request serving this stream and release it. Returns False if already released."""
+        if self._released:
+            return False
+        handle = self._handle
+        if handle is not None and handle.task is not None and not handle.task.done():
+            handle.aborted = True
+            handle.task.cancel()
+        # The cancelled stream's own finally may never run (a suspended generator
+        # is only closed when collected), so release here
+        self.release()
+        return True
+
+    def release(self) -> None:
+        cleanup, self._cleanup = self._cleanup, None
+        try:
+            if cleanup is not None:
+                cleanup()
+        finally:
+            self.release_slot()
+
+    def release_slot(self) -> None:
+        """Free the connection slot only. Safe outside the event loop (e.g. from a GC finalizer)."""
+        if self._released:
+            return
+        self._released = True
+        self._limiter._release(self)
+
+
+class ConnectionLimiter:
+    """Counts open live-stream connections and rejects new ones over the caps."""
+
+    def __init__(self, max_total: int, max_per_ip: int) -> None:
+        self.max_total = max_total
+        self.max_per_ip = max_per_ip
+        self.total = 0
+        self.rejected = 0
+        self._per_ip: dict[str, int] = {}
+        self._leases: set[StreamLease] = set()
+        self._reaper: asyncio.Task | None = None
+
+    def acquire(self, ip: str) -> StreamLease:
+        if self.total >= self.max_total:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many live connections, please retry shortly",
+                headers={"Retry-After": "10"},
+            )
+        if self.max_per_ip > 0 and self._per_ip.get(ip, 0) >= self.max_per_ip:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many live connections from this address",
+            )
+        self.total += 1
+        self._per_ip[ip] = self._per_ip.get(ip, 0) + 1
+        lease = StreamLease(self, ip)
+        self._leases.add(lease)
+        return lease
+
+    def _release(self, lease: StreamLease) -> None:
+        self._leases.discard(lease)
+        self.total -= 1
+        remaining = self._per_ip.get(lease.ip, 1) - 1
+        if remaining > 0:
+            self._per_ip[lease.ip] = remaining
+        else:
+            self._per_ip.pop(lease.ip, None)
+
+    def reap(
+        self,
+        max_lifetime: float = MAX_STREAM_LIFETIME_SECONDS,
+        grace: float = STREAM_CLOSE_GRACE_SECONDS,
+    ) -> int:
+        """
+        Close streams that have been open longer than max_lifetime, and cancel
+        streams still holding their slot grace seconds after being asked to close.
+        """
+        now = time.monotonic()
+        reaped = 0
+        aborted = 0
+        for lease in list(self._leases):
+            if lease.closing_since is not None:
+                if now - lease.closing_since > grace and lease.abort():
+                    aborted += 1
+            elif now - lease.started > max_lifetime and lease.closer is not None:
+                lease.closing()
+                lease.closer()
+                lease.closer = None
+                reaped += 1
+        stream_metrics["reaped"] += reaped
+        stream_metrics["aborted"] += aborted
+        if aborted:
+            logger.warning(f"Aborted {aborted} live streams that stopped reading after being closed")
+        return reaped
+
+    async def _reap_forever(self) -> None:
+        while True:
+            await asyncio.sleep(REAPER_INTERVAL_SECONDS)
+            try:
+                reaped = self.reap()
+                if reaped:
+                    logger.info(f"Reaped {reaped} live streams past their maximum lifetime")
+            except Exception as e:
+                logger.error(f"Stream reaper failed: {e}")
+
+    def start_reaper(self) -> None:
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_forever())
+
+    def stop_reaper(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.total,
+            "max_connections": self.max_total,
+            "distinct_ips": len(self._per_ip),
+            "rejected": self.rejected,
+        }
+
+
+stream_limiter = ConnectionLimiter(MAX_STREAMS_PER_PROCESS, MAX_STREAMS_PER_IP)
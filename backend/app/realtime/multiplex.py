@@ -0,0 +1,164 @@
+"""Multiplexed WebSocket connections over the shared live topics and watchers"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.api.utils.serialization import dumps
+from app.realtime.announcements import announcement_feed
+from app.realtime.hub import live_hub, parse_event_id
+from app.realtime.subscriber import Subscriber
+from app.realtime.watchers import match_watchers
+
+logger = logging.getLogger(__name__)
+
+MAX_SUBSCRIPTIONS_PER_SOCKET = int(os.getenv("LIVE_WS_MAX_SUBSCRIPTIONS", "32"))
+
+
+def ws_message(channel: str, frame: bytes) -> str:
+    """
+    Re-wrap a pre-encoded SSE frame as a WebSocket JSON message.
+    The data payload is spliced in as-is, so nothing is serialized per client.
+    """
+    frame = frame.rstrip(b"\n")
+    if frame.startswith(b"data: "):
+        head, data = b"", frame[6:]
+    else:
+        idx = frame.index(b"\ndata: ")
+        head, data = frame[:idx], frame[idx + 7:]
+
+    event = b"message"
+    event_id = None
+    for line in head.split(b"\n"):
+        if line.startswith(b"id: "):
+            event_id = line[4:]
+        elif line.startswith(b"event: "):
+            event = line[7:]
+
+    message = b'{"channel":' + dumps(channel) + b',"event":"' + event + b'"'
+    if event_id is not None:
+        message += b',"id":"' + event_id + b'"'
+    return (message + b',"data":' + data + b"}").decode("utf-8")
+
+
+def _open_channel(channel: str, last_event_id: int | None) -> tuple[Subscriber, Callable[[Subscriber], None]]:
+    """Subscribe to a channel name; raises ValueError for unknown channels."""
+    if channel == "announcements":
+        return announcement_feed.subscribe(), announcement_feed.unsubscribe
+
+    kind, _, key = channel.partition(":")
+    if kind == "sport" and key:
+        sport_slug = None if key == "*" else key
+        sub = live_hub.subscribe(sport_slug, deltas=True, last_event_id=last_event_id)
+        return sub, live_hub.unsubscribe
+    if kind == "match" and key:
+        return match_watchers.subscribe(key), match_watchers.unsubscribe
+
+    raise ValueError(f"Unknown channel: {channel}")
+
+
+class LiveSocket:
+    """
+    One client WebSocket carrying any mix of channels:
+      - "sport:<slug>" or "sport:*"  live/upcoming matches (snapshot + deltas)
+      - "match:<id>"                 a single match until it is COMPLETED
+      - "announcements"              pinned announcements
+
+    Client messages: {"action": "subscribe" | "unsubscribe", "channel": "...",
+    "last_event_id": <optional id string for sport channels>}
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_evict: Callable[[], None] | None = None,
+        on_recover: Callable[[], None] | None = None,
+    ) -> None:
+        self.websocket = websocket
+        # Called when a channel's subscriber is evicted for lagging (see Subscriber.on_evict),
+        # and once a later send shows the client is reading again
+        self._on_evict = on_evict
+        self._on_recover = on_recover
+        self._channels: dict[str, tuple[Subscriber, Callable[[Subscriber], None], asyncio.Task]] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def run(self) -> None:
+        try:
+            while True:
+                raw = await self.websocket.receive_text()
+                try:
+                    message = json.loads(raw)
+                    action = message.get("action")
+                    channel = str(message.get("channel", ""))
+                except (ValueError, AttributeError):
+                    await self._send_error(None, "Invalid message")
+                    continue
+
+                if action == "subscribe":
+                    last_event_id = message.get("last_event_id")
+                    await self._subscribe(channel, parse_event_id(last_event_id) if isinstance(last_event_id, str) else None)
+                elif action == "unsubscribe":
+                    self._unsubscribe(channel)
+                else:
+                    await self._send_error(channel, "Unknown action")
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for channel in list(self._channels):
+                self._unsubscribe(channel)
+
+    async def _send(self, text: str) -> None:
+        async with self._send_lock:
+            await self.websocket.send_text(text)
+
+    async def _send_error(self, channel: str | None, error: str) -> None:
+        await self._send(dumps({"channel": channel, "event": "error", "data": {"error": error}}).decode("utf-8"))
+
+    async def _subscribe(self, channel: str, last_event_id: int | None) -> None:
+        if channel in self._channels:
+            return
+        if len(self._channels) >= MAX_SUBSCRIPTIONS_PER_SOCKET:
+            await self._send_error(channel, "Too many subscriptions on this connection")
+            return
+        try:
+            sub, release = _open_channel(channel, last_event_id)
+        except ValueError as e:
+            await self._send_error(channel, str(e))
+            return
+        sub.on_evict = self._on_evict
+        task = asyncio.create_task(self._pump(channel, sub))
+        self._channels[channel] = (sub, release, task)
+
+    def _unsubscribe(self, channel: str) -> None:
+        entry = self._channels.pop(channel, None)
+        if entry is None:
+            return
+        sub, release, task = entry
+        if task is not asyncio.current_task():
+            task.cancel()
+        release(sub)
+
+    async def _pump(self, channel: str, sub: Subscriber) -> None:
+        try:
+            while True:
+                frame = await sub.next_frame()
+                if frame is None:
+                    break
+                await self._send(ws_message(channel, frame))
+            # Source finished (e.g. match completed) or the client fell too far behind
+            await self._send(dumps({"channel": channel, "event": "closed"}).decode("utf-8"))
+            if sub.evicted and self._on_recover is not None:
+                # Only this channel lagged; the socket is writable again, so keep it
+                self._on_recover()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"WebSocket pump for {channel} stopped: {e}")
+        entry = self._channels.get(channel)
+        if entry is not None and entry[0] is sub:
+            self._unsubscribe(channel)
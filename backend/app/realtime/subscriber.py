@@ -0,0 +1,162 @@
+"""Per-client subscriber queues with bounded buffering and slow-consumer eviction"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncIterator, Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered per client before "latest snapshot wins" coalescing kicks in
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("LIVE_STREAM_QUEUE_SIZE", "32"))
+
+# A client that has not read anything for this long while frames are waiting is dropped
+SUBSCRIBER_MAX_LAG_SECONDS = float(os.getenv("LIVE_STREAM_MAX_LAG_SECONDS", "30"))
+
+# Idle streams send an SSE comment this often, which also lets us notice
+# clients that went away behind a proxy that keeps the TCP connection open
+HEARTBEAT_SECONDS = float(os.getenv("LIVE_STREAM_HEARTBEAT_SECONDS", "15"))
+HEARTBEAT_FRAME = b": ping\n\n"
+
+# Process-wide counters, exposed through /health/streams
+stream_metrics = {
+    "frames_dropped": 0,
+    "coalesced": 0,
+    "evicted": 0,
+    "disconnected": 0,
+    "reaped": 0,
+    "aborted": 0,
+}
+
+
+class Subscriber:
+    """
+    A single client connected to a live topic or match watcher.
+    A None in the queue means the source has finished and the stream should end.
+
+    The queue is bounded. When a slow client's queue is full, everything it has
+    not read yet is discarded and replaced by a single resync frame (the current
+    snapshot), so memory per client never grows past SUBSCRIBER_QUEUE_SIZE frames.
+
+    Eviction only queues the end marker, which a client that stopped reading
+    never reaches; on_evict lets the stream's lease cancel it instead.
+    """
+
+    def __init__(
+        self,
+        topic,
+        deltas: bool = False,
+        resync: Callable[["Subscriber"], bytes | None] | None = None,
+    ) -> None:
+        self.topic = topic
+        self.deltas = deltas
+        self.queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.closed = False
+        self.evicted = False
+        self.drops = 0
+        self._resync = resync
+        self.on_evict: Callable[[], None] | None = None
+        # When the oldest unread frame was queued (None while the queue is empty)
+        self._pending_since: float | None = None
+
+    def offer(self, frame: bytes) -> None:
+        """Queue a frame without ever blocking the publisher."""
+        if self.closed:
+            return
+
+        now = time.monotonic()
+        if self._pending_since is not None and now - self._pending_since > SUBSCRIBER_MAX_LAG_SECONDS:
+            logger.info("Evicting live-stream subscriber that stopped reading")
+            stream_metrics["evicted"] += 1
+            self.evicted = True
+            self.close(discard_pending=True)
+            if self.on_evict is not None:
+                self.on_evict()
+            return
+
+        if self._pending_since is None:
+            self._pending_since = now
+
+        try:
+            self.queue.put_nowait(frame)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        # Latest snapshot wins: drop the backlog and resync the client
+        dropped = self._clear()
+        self.drops += dropped
+        stream_metrics["frames_dropped"] += dropped
+        stream_metrics["coalesced"] += 1
+        snapshot = self._resync(self) if self._resync is not None else None
+        self.queue.put_nowait(snapshot if snapshot is not None else frame)
+
+    async def next_frame(self) -> bytes | None:
+        frame = await self.queue.get()
+        self._pending_since = None if self.queue.empty() else time.monotonic()
+        return frame
+
+    def close(self, discard_pending: bool = False) -> None:
+        """End the stream; the consumer sees None after any frames still queued."""
+        if self.closed:
+            return
+        self.closed = True
+        if discard_pending:
+            self._clear()
+        elif self.queue.full():
+            # Make room for the end marker without losing the latest state: the
+            # frame just queued may be the final one (e.g. a COMPLETED match)
+            snapshot = self._resync(self) if self._resync is not None else None
+            if snapshot is not None:
+                dropped = self._clear()
+                self.queue.put_nowait(snapshot)
+            else:
+                self.queue.get_nowait()
+                dropped = 1
+            self.drops += dropped
+            stream_metrics["frames_dropped"] += dropped
+            if self.queue.full():
+                # Only with a one-frame queue: the snapshot takes the last slot
+                self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def _clear(self) -> int:
+        dropped = 0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            dropped += 1
+        return dropped
+
+
+async def iter_frames(
+    sub: Subscriber,
+    is_disconnected: Callable[[], Awaitable[bool]],
+) -> AsyncIterator[bytes]:
+    """
+    Yield a subscriber's frames until its source ends or the client goes away.
+    Sends a heartbeat comment whenever the stream has been idle for HEARTBEAT_SECONDS.
+    """
+    while True:
+        try:
+            frame = await asyncio.wait_for(sub.next_frame(), timeout=HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            if await is_disconnected():
+                stream_metrics["disconnected"] += 1
+                return
+            yield HEARTBEAT_FRAME
+            continue
+        if frame is None:
+            return
+        yield frame
+
+
+def queue_stats(subscribers: list[Subscriber]) -> dict:
+    """Queue depth gauges for a group of subscribers."""
+    depths = [sub.queue.qsize() for sub in subscribers]
+    return {
+        "queued_frames": sum(depths),
+        "max_queue_depth": max(depths, default=0),
+        "subscriber_drops": sum(sub.drops for sub in subscribers),
+    }
@@ -0,0 +1,300 @@
+"""Cross-process transports for the change bus (one host, several uvicorn workers)"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import secrets
+from typing import Callable
+
+from app.realtime.bus import ChangeEvent
+
+logger = logging.getLogger(__name__)
+
+RECONNECT_DELAY_SECONDS = 1.0
+# The relay disconnects a worker with more than this much unsent data; it
+# reconnects and catches up through its safety poll
+PEER_MAX_BUFFER_BYTES = 1 << 20
+
+
+def encode_event(event: ChangeEvent, origin: str) -> str:
+    return json.dumps({
+        "kind": event.kind,
+        "action": event.action,
+        "id": event.id,
+        "sport_id": event.sport_id,
+        "origin": origin,
+    })
+
+
+def decode_event(raw: str | bytes) -> tuple[ChangeEvent, str | None]:
+    data = json.loads(raw)
+    event = ChangeEvent(data["kind"], data["action"], data["id"], data.get("sport_id"), remote=True)
+    return event, data.get("origin")
+
+
+class Transport(abc.ABC):
+    """
+    Carries locally published events to other workers and hands events from
+    other workers to deliver(). Subclasses implement _run() and _write().
+    """
+
+    def __init__(self) -> None:
+        self.origin = f"{os.getpid()}-{secrets.token_hex(4)}"
+        self.deliver: Callable[[ChangeEvent], None] | None = None
+        self._outbox: asyncio.Queue[str] = asyncio.Queue(maxsize=10_000)
+        self._tasks: list[asyncio.Task] = []
+        self.dropped = 0
+        self._dropped_offline = 0
+
+    async def start(self, deliver: Callable[[ChangeEvent], None]) -> None:
+        self.deliver = deliver
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._drain())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def send(self, event: ChangeEvent) -> None:
+        try:
+            self._outbox.put_nowait(encode_event(event, self.origin))
+        except asyncio.QueueFull:
+            # Other workers still catch up through their safety poll
+            self.dropped += 1
+            logger.warning("Change bus outbox full; dropping cross-worker event")
+
+    def _drop_offline(self) -> None:
+        """Count an event that could not be sent because the transport is disconnected."""
+        self.dropped += 1
+        if self._dropped_offline == 0:
+            logger.warning("Change bus disconnected; dropping cross-worker events until it reconnects")
+        self._dropped_offline += 1
+
+    def _reconnected(self) -> None:
+        if self._dropped_offline:
+            logger.warning(
+                f"Change bus reconnected after dropping {self._dropped_offline} events; "
+                "other workers catch up through their safety poll"
+            )
+            self._dropped_offline = 0
+
+    def _receive(self, raw: str | bytes) -> None:
+        try:
+            event, origin = decode_event(raw)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed change bus message: {e}")
+            return
+        if origin != self.origin and self.deliver is not None:
+            self.deliver(event)
+
+    async def _drain(self) -> None:
+        while True:
+            message = await self._outbox.get()
+            try:
+                await self._write(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change bus send failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "outbox": self._outbox.qsize(),
+            "dropped": self.dropped,
+        }
+
+    @abc.abstractmethod
+    async def _run(self) -> None:
+        """Receive messages from other workers and pass them to _receive()."""
+
+    @abc.abstractmethod
+    async def _write(self, message: str) -> None:
+        """Send one encoded message to the other workers."""
+
+
+class UnixSocketTransport(Transport):
+    """
+    Fan-out over a Unix domain socket. The worker holding the lock file acts as
+    the relay: it forwards every line it receives to all other connected
+    workers. The others connect as clients, and one takes over if the relay dies
+    (the OS drops the lock with the process).
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self.path = path
+        self._lock_fd: int | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._peers: set[asyncio.StreamWriter] = set()
+        self._upstream: asyncio.StreamWriter | None = None
+        self.slow_peers = 0
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if await self._try_serve():
+                    await self._server.serve_forever()
+                else:
+                    await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change bus socket error: {e}")
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _try_serve(self) -> bool:
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # Stale socket left by a dead relay
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=self.path)
+        logger.info(f"Change bus relay listening on {self.path}")
+        self._reconnected()
+        return True
+
+    async def _handle_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._peers.add(writer)
+        try:
+            while line := await reader.readline():
+                self._receive(line)
+                self._forward(line, exclude=writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    def _forward(self, line: bytes, exclude: asyncio.StreamWriter | None = None) -> None:
+        # Writes are not awaited, so a worker that stopped reading is cut off
+        # instead of buffering without bound
+        for peer in list(self._peers):
+            if peer is exclude:
+                continue
+            if peer.transport.get_write_buffer_size() > PEER_MAX_BUFFER_BYTES:
+                logger.warning("Disconnecting change bus peer that stopped reading")
+                self.slow_peers += 1
+                self._peers.discard(peer)
+                peer.transport.abort()
+                continue
+            try:
+                peer.write(line)
+            except Exception:
+                self._peers.discard(peer)
+
+    async def _follow(self) -> None:
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        self._upstream = writer
+        self._reconnected()
+        try:
+            while line := await reader.readline():
+                self._receive(line)
+        finally:
+            self._upstream = None
+            writer.close()
+
+    async def _write(self, message: str) -> None:
+        line = message.encode("utf-8") + b"\n"
+        if self._server is not None:
+            self._forward(line)
+        elif self._upstream is not None:
+            self._upstream.write(line)
+            await self._upstream.drain()
+        else:
+            self._drop_offline()
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "role": "relay" if self._server is not None else "follower",
+            "peers": len(self._peers),
+            "slow_peers": self.slow_peers,
+        }
+
+    async def stop(self) -> None:
+        # Hang up on peers first so their handlers finish before the relay stops
+        for peer in list(self._peers):
+            peer.close()
+        await asyncio.sleep(0)
+        await super().stop()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+class PostgresNotifyTransport(Transport):
+    """
+    Fan-out with Postgres LISTEN/NOTIFY. Prisma cannot LISTEN, so this needs the
+    optional asyncpg package and a direct (non-pgbouncer) connection URL.
+    """
+
+    CHANNEL = "ghs_change_bus"
+
+    def __init__(self, dsn: str) -> None:
+        super().__init__()
+        self.dsn = dsn
+        self._conn = None
+
+    async def _run(self) -> None:
+        try:
+            import asyncpg
+        except ImportError:
+            logger.error("CHANGE_BUS_BACKEND=postgres requires the asyncpg package")
+            return
+
+        while True:
+            try:
+                self._conn = await asyncpg.connect(self.dsn)
+                await self._conn.add_listener(
+                    self.CHANNEL, lambda _conn, _pid, _channel, payload: self._receive(payload)
+                )
+                logger.info(f"Change bus listening on Postgres channel {self.CHANNEL}")
+                self._reconnected()
+                while not self._conn.is_closed():
+                    await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+            except asyncio.CancelledError:
+                if self._conn is not None:
+                    await self._conn.close()
+                raise
+            except Exception as e:
+                logger.warning(f"Change bus Postgres connection error: {e}")
+            self._conn = None
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def _write(self, message: str) -> None:
+        if self._conn is None:
+            self._drop_offline()
+            return
+        await self._conn.execute("SELECT pg_notify($1, $2)", self.CHANNEL, message)
+
+
+def transport_from_env() -> Transport | None:
+    """Build the transport selected by CHANGE_BUS_BACKEND (default: in-process only)."""
+    backend = (os.getenv("CHANGE_BUS_BACKEND") or "memory").lower()
+    if backend == "memory":
+        return None
+    if backend == "unix":
+        return UnixSocketTransport(os.getenv("CHANGE_BUS_SOCKET", "/tmp/ghscarnival-change-bus.sock"))
+    if backend == "postgres":
+        dsn = os.getenv("CHANGE_BUS_DATABASE_URL") or os.getenv("DIRECT_URL")
+        if not dsn:
+            raise RuntimeError("CHANGE_BUS_BACKEND=postgres needs CHANGE_BUS_DATABASE_URL or DIRECT_URL")
+        return PostgresNotifyTransport(dsn)
+    raise RuntimeError(f"Unknown CHANGE_BUS_BACKEND: {backend}")
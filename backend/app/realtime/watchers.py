@@ -0,0 +1,163 @@
+"""Shared per-match watchers for single-match live streams"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime
+
+from app.api.utils.serialization import content_digest
+from app.db.scoreboard import scoreboard
+from app.realtime.bus import ChangeEvent, change_bus
+from app.realtime.hub import SAFETY_POLL_SECONDS, sse_frame
+from app.realtime.subscriber import Subscriber, queue_stats
+
+logger = logging.getLogger(__name__)
+
+
+class MatchWatcher:
+    """
+    Reads one match from the scoreboard on change (or safety poll) and fans
+    frames out to every viewer. Closes itself once the match is COMPLETED or
+    no longer exists.
+    """
+
+    def __init__(self, match_id: str, registry: "MatchWatcherRegistry") -> None:
+        self.match_id = match_id
+        self.subscribers: set[Subscriber] = set()
+        self.last_frame: bytes | None = None
+        self.closed = False
+        self._registry = registry
+        self._last_digest: str | None = None
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def _broadcast(self, frame: bytes) -> None:
+        for sub in self.subscribers:
+            sub.offer(frame)
+
+    def resync_frame(self, sub: Subscriber) -> bytes | None:
+        return self.last_frame
+
+    def _close(self) -> None:
+        # Ends every subscriber's stream once its queued frames are sent
+        self.closed = True
+        for sub in self.subscribers:
+            sub.close()
+        self._registry._remove(self)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                # The scoreboard already holds every applied write (its reconcile
+                # pass catches the rest), so a wake-up costs no query
+                await scoreboard.ensure_loaded()
+                match_data = scoreboard.get(self.match_id)
+
+                if match_data is None:
+                    self.last_frame = sse_frame({"error": "Match not found"}, event="error")
+                    self._broadcast(self.last_frame)
+                    self._close()
+                    return
+
+                digest = content_digest(match_data)
+                final = match_data["status"] == "COMPLETED"
+
+                # Only send update if match data has changed
+                if digest != self._last_digest:
+                    data = {
+                        "match": match_data,
+                        "timestamp": datetime.utcnow().isoformat(),
+                        "final": final
+                    }
+                    self.last_frame = sse_frame(data)
+                    self._last_digest = digest
+                    self._broadcast(self.last_frame)
+
+                # If match is completed, the final update has been sent
+                if final:
+                    self._close()
+                    return
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Match watcher poll failed (match={self.match_id}): {e}")
+                error_data = {
+                    "error": str(e),
+                    "timestamp": datetime.utcnow().isoformat()
+                }
+                self._broadcast(sse_frame(error_data, event="error"))
+
+            # Sleep until this match changes, polling only as a safety net
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=SAFETY_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+
+class MatchWatcherRegistry:
+    """Reference-counted watchers keyed by match ID."""
+
+    def __init__(self) -> None:
+        self._watchers: dict[str, MatchWatcher] = {}
+        self._listening = False
+
+    def _on_change(self, event: ChangeEvent) -> None:
+        # Remote match writes are re-published once the scoreboard has them
+        if event.kind != "match" or event.remote:
+            return
+        watcher = self._watchers.get(event.id)
+        if watcher is not None:
+            watcher.wake()
+
+    def subscribe(self, match_id: str) -> Subscriber:
+        if not self._listening:
+            change_bus.subscribe(self._on_change)
+            self._listening = True
+
+        watcher = self._watchers.get(match_id)
+        if watcher is None:
+            watcher = MatchWatcher(match_id, self)
+            self._watchers[match_id] = watcher
+
+        sub = Subscriber(watcher, resync=watcher.resync_frame)
+        watcher.subscribers.add(sub)
+        if watcher.last_frame is not None:
+            sub.offer(watcher.last_frame)
+        watcher.start()
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        watcher = sub.topic
+        watcher.subscribers.discard(sub)
+        if not watcher.subscribers and not watcher.closed:
+            watcher.stop()
+            self._remove(watcher)
+
+    def _remove(self, watcher: MatchWatcher) -> None:
+        if self._watchers.get(watcher.match_id) is watcher:
+            del self._watchers[watcher.match_id]
+
+    def stats(self) -> dict:
+        subscribers = [sub for w in self._watchers.values() for sub in w.subscribers]
+        return {
+            "watchers": len(self._watchers),
+            "subscribers": len(subscribers),
+            **queue_stats(subscribers),
+        }
+
+
+match_watchers = MatchWatcherRegistry()
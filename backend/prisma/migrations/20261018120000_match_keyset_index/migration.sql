@@ -0,0 +1,2 @@
+-- CreateIndex
+CREATE INDEX "Match_status_updatedAt_id_idx" ON "Match"("status", "updatedAt" DESC, "id");
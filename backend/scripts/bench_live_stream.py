@@ -0,0 +1,310 @@
+"""
+Live-stream load and latency benchmark
+Run with: python -m scripts.bench_live_stream --clients 2000 --match-clients 500
+
+Starts the API in a child process against the in-memory Prisma stand-in, opens
+many /public/live-stream and /public/live-stream/match/{id} clients, applies
+scripted PATCH /admin/matches/{id} score updates and reports:
+  - update-to-delivery latency percentiles
+  - DB queries per second (idle and while updating)
+  - server memory per connection and CPU usage
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import re
+import resource
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(backend_root))
+
+SEQ_PATTERN = re.compile(rb'"bench_seq":(\d+)')
+
+
+def _raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------------------------------------------------------------------------
+# Server process
+# ---------------------------------------------------------------------------
+
+def run_server(port: int, args, query_counter, ready) -> None:
+    """Child process: seed the stand-in DB and serve the real app with uvicorn."""
+    _raise_fd_limit()
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-" + "x" * 32)
+    os.environ["LIVE_STREAM_MAX_CONNECTIONS"] = str(10 * (args.clients + args.match_clients) + 100)
+    os.environ["LIVE_STREAM_MAX_PER_IP"] = str(10 * (args.clients + args.match_clients) + 100)
+
+    from scripts.inmemory_prisma import QueryCounter, install
+
+    db = install(QueryCounter(query_counter))
+
+    import uvicorn
+    from app.main import app
+    from app.api.utils.security import create_access_token
+
+    async def seed() -> dict:
+        sports = []
+        for i in range(args.sports):
+            sports.append(await db.sport.create({"name": f"Sport {i}", "slug": f"sport-{i}"}))
+        live_ids = {}
+        for j in range(args.matches):
+            sport = sports[j % len(sports)]
+            status = "LIVE" if j < len(sports) else ("UPCOMING" if j % 3 else "COMPLETED")
+            match = await db.match.create({
+                "sportId": sport.id,
+                "teamA": f"Team A{j}",
+                "teamB": f"Team B{j}",
+                "status": status,
+                "score": {"teamA": {"score": "0"}, "teamB": {"score": "0"}},
+            })
+            if status == "LIVE":
+                live_ids[sport.slug] = match.id
+        await db.announcement.create({"title": "Welcome", "body": "Benchmark", "pinned": True})
+        await db.user.create({
+            "id": "bench-admin",
+            "email": "bench@example.com",
+            "username": "bench",
+            "passwordHash": "unused",
+            "role": "SUPER_ADMIN",
+        })
+        return {"live": live_ids, "token": create_access_token({"sub": "bench-admin"})}
+
+    async def main() -> None:
+        info = await seed()
+        config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+        server = uvicorn.Server(config)
+        serve = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        ready.send(info)
+        await serve
+
+    asyncio.run(main())
+
+
+# ---------------------------------------------------------------------------
+# Client side
+# ---------------------------------------------------------------------------
+
+class StreamClient:
+    """Minimal raw-socket SSE reader that records when each bench_seq arrives."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.seen: dict[int, float] = {}
+        self.connected = False
+
+    async def run(self, port: int) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(
+            f"GET {self.path} HTTP/1.1\r\nHost: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(f"{self.path}: {status.decode().strip()}")
+        while (await reader.readline()) not in (b"\r\n", b""):
+            pass
+        self.connected = True
+
+        carry = b""
+        try:
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    break
+                now = time.perf_counter()
+                data = carry + chunk
+                for seq in SEQ_PATTERN.findall(data):
+                    self.seen.setdefault(int(seq), now)
+                carry = data[-64:]
+        finally:
+            writer.close()
+
+
+async def patch_score(port: int, token: str, match_id: str, seq: int) -> None:
+    body = f'{{"score": {{"teamA": {{"score": "{seq}"}}, "bench_seq": {seq}}}}}'.encode()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        (
+            f"PATCH /api/admin/matches/{match_id} HTTP/1.1\r\n"
+            "Host: 127.0.0.1\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Cookie: access_token={token}; csrf_token=bench\r\n"
+            "X-CSRF-Token: bench\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode() + body
+    )
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        raise RuntimeError(f"PATCH failed: {status.decode().strip()}")
+    await reader.read()
+    writer.close()
+
+
+def _proc_stats(pid: int) -> tuple[float | None, float | None]:
+    """(RSS in MB, CPU seconds) of a process, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        return rss_kb / 1024, cpu
+    except (OSError, StopIteration, IndexError, ValueError):
+        return None, None
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_clients(port: int, pid: int, info: dict, args, query_counter) -> None:
+    slugs = list(info["live"].keys())
+
+    base_rss, _ = _proc_stats(pid)
+
+    # Open connections: spread list clients across sport filters plus "all sports"
+    clients: list[StreamClient] = []
+    for i in range(args.clients):
+        choice = i % (len(slugs) + 1)
+        path = "/api/public/live-stream" if choice == len(slugs) else f"/api/public/live-stream?sport_slug={slugs[choice]}"
+        clients.append(StreamClient(path))
+    for i in range(args.match_clients):
+        clients.append(StreamClient(f"/api/public/live-stream/match/{info['live'][slugs[i % len(slugs)]]}"))
+
+    print(f"🔌 Opening {len(clients)} stream connections...")
+    start = time.perf_counter()
+    tasks = []
+    for i in range(0, len(clients), args.connect_batch):
+        batch = clients[i:i + args.connect_batch]
+        tasks.extend(asyncio.create_task(c.run(port)) for c in batch)
+        await asyncio.sleep(0.01)
+    while sum(c.connected for c in clients) < len(clients):
+        failed = [t for t in tasks if t.done() and t.exception()]
+        if failed:
+            raise failed[0].exception()
+        await asyncio.sleep(0.05)
+    print(f"  ✅ Connected in {time.perf_counter() - start:.2f}s")
+
+    await asyncio.sleep(1.0)
+    connected_rss, cpu_before = _proc_stats(pid)
+
+    # Idle window: with push-based streams this should be ~0 queries
+    q0 = query_counter.value
+    await asyncio.sleep(args.idle_seconds)
+    idle_qps = (query_counter.value - q0) / args.idle_seconds
+
+    # Scripted score updates, round-robin over the live matches
+    print(f"🏏 Applying {args.updates} score updates...")
+    sent_at: dict[int, float] = {}
+    expected: dict[int, str] = {}
+    q1 = query_counter.value
+    update_start = time.perf_counter()
+    for seq in range(1, args.updates + 1):
+        slug = slugs[seq % len(slugs)]
+        sent_at[seq] = time.perf_counter()
+        await patch_score(port, info["token"], info["live"][slug], seq)
+        expected[seq] = slug
+        await asyncio.sleep(args.update_interval)
+    await asyncio.sleep(args.drain_seconds)
+    update_duration = time.perf_counter() - update_start
+    update_qps = (query_counter.value - q1) / update_duration
+    _, cpu_after = _proc_stats(pid)
+
+    # Latencies: every client that should see an update and did
+    latencies = []
+    missing = 0
+    live_ids = info["live"]
+    for client in clients:
+        for seq, slug in expected.items():
+            interested = (
+                client.path == "/api/public/live-stream"
+                or client.path.endswith(f"sport_slug={slug}")
+                or client.path.endswith(f"/match/{live_ids[slug]}")
+            )
+            if not interested:
+                continue
+            if seq in client.seen:
+                latencies.append((client.seen[seq] - sent_at[seq]) * 1000)
+            else:
+                missing += 1
+
+    for task in tasks:
+        task.cancel()
+
+    print("\n" + "=" * 50)
+    print("📊 Live-stream benchmark")
+    print("=" * 50)
+    print(f"  Connections:       {args.clients} list + {args.match_clients} match")
+    print(f"  Deliveries:        {len(latencies)} ({missing} missed)")
+    if latencies:
+        print(
+            "  Latency (ms):      "
+            f"p50={_percentile(latencies, 50):.1f} p90={_percentile(latencies, 90):.1f} "
+            f"p99={_percentile(latencies, 99):.1f} max={max(latencies):.1f} "
+            f"mean={statistics.mean(latencies):.1f}"
+        )
+    print(f"  DB queries/s:      idle={idle_qps:.1f} updating={update_qps:.1f}")
+    if base_rss is not None and connected_rss is not None:
+        per_conn_kb = (connected_rss - base_rss) * 1024 / max(1, len(clients))
+        print(f"  Server RSS:        {base_rss:.1f} MB -> {connected_rss:.1f} MB ({per_conn_kb:.1f} KB/connection)")
+    if cpu_before is not None and cpu_after is not None:
+        cpu = cpu_after - cpu_before
+        print(f"  Server CPU:        {cpu:.2f}s over {update_duration:.1f}s ({100 * cpu / update_duration:.0f}% of one core)")
+    print("=" * 50 + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000, help="/public/live-stream connections")
+    parser.add_argument("--match-clients", type=int, default=200, help="/public/live-stream/match/{id} connections")
+    parser.add_argument("--sports", type=int, default=5)
+    parser.add_argument("--matches", type=int, default=60)
+    parser.add_argument("--updates", type=int, default=50, help="Number of scripted score updates")
+    parser.add_argument("--update-interval", type=float, default=0.2, help="Seconds between updates")
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--drain-seconds", type=float, default=2.0)
+    parser.add_argument("--connect-batch", type=int, default=200)
+    args = parser.parse_args()
+
+    _raise_fd_limit()
+    port = _free_port()
+    query_counter = multiprocessing.Value("q", 0)
+    parent_conn, child_conn = multiprocessing.Pipe()
+
+    server = multiprocessing.Process(target=run_server, args=(port, args, query_counter, child_conn), daemon=True)
+    server.start()
+    try:
+        if not parent_conn.poll(60):
+            raise RuntimeError("Server did not start")
+        info = parent_conn.recv()
+        asyncio.run(run_clients(port, server.pid, info, args, query_counter))
+    finally:
+        server.terminate()
+        server.join(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Response serialization benchmark
+Run with: python -m scripts.bench_serialization --matches 100
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) against
+FastJSONResponse for a match listing, both with Prisma models (sport included)
+and with the plain dicts the scoreboard serves.
+"""
+import argparse
+import json
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add backend to path
+backend_root = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(backend_root))
+
+
+def _build_matches(count: int):
+    from scripts.inmemory_prisma import Match, Sport
+
+    now = datetime.now(timezone.utc)
+    sport = Sport(id="sport-1", name="Cricket", slug="cricket", createdAt=now, updatedAt=now)
+    return [
+        Match(
+            id=f"match-{i}",
+            sportId=sport.id,
+            sport=sport,
+            teamA=f"Team {i}A",
+            teamB=f"Team {i}B",
+            status="LIVE",
+            startTime=now,
+            venue="Main Ground",
+            score={"teamA": {"runs": 120 + i, "wickets": 3, "overs": "14.2"}, "teamB": {"runs": 0}},
+            createdAt=now,
+            updatedAt=now,
+        )
+        for i in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark response serialization paths")
+    parser.add_argument("--matches", type=int, default=100, help="Matches per payload")
+    parser.add_argument("--runs", type=int, default=300, help="Timed runs per path")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+
+    from app.api.utils.responses import FastJSONResponse
+
+    matches = _build_matches(args.matches)
+    models = {"items": matches}
+    dicts = {"items": [m.model_dump(mode="json") for m in matches]}
+    render = FastJSONResponse(None).render
+
+    cases = [
+        ("models: jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(models)).encode("utf-8")),
+        ("models: FastJSONResponse", lambda: render(models)),
+        ("dicts:  jsonable_encoder + json.dumps", lambda: json.dumps(jsonable_encoder(dicts)).encode("utf-8")),
+        ("dicts:  FastJSONResponse", lambda: render(dicts)),
+    ]
+
+    print(f"{args.matches} matches per payload, {args.runs} runs each")
+    baseline = None
+    for name, fn in cases:
+        elapsed_ms = timeit.timeit(fn, number=args.runs) / args.runs * 1000
+        if name.endswith("json.dumps"):
+            baseline = elapsed_ms
+            print(f"  {name:40s} {elapsed_ms:8.3f} ms")
+        else:
+            print(f"  {name:40s} {elapsed_ms:8.3f} ms  ({baseline / elapsed_ms:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+bcrypt cost calibration
+Run with: python -m scripts.calibrate_bcrypt --target-ms 250
+
+Times bcrypt at a range of costs on this host and recommends the highest cost
+whose median hash time stays within the target. Set the result as
+BCRYPT_ROUNDS; existing hashes are upgraded on each user's next login.
+"""
+import argparse
+import statistics
+import time
+
+import bcrypt
+
+
+def measure(cost: int, samples: int) -> float:
+    """Median milliseconds for one hashpw at the given cost."""
+    timings = []
+    for _ in range(samples):
+        salt = bcrypt.gensalt(rounds=cost)
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", salt)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recommend a bcrypt cost for a target hash time")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Maximum acceptable hash time")
+    parser.add_argument("--min-cost", type=int, default=10, help="Lowest cost to consider")
+    parser.add_argument("--max-cost", type=int, default=14, help="Highest cost to try")
+    parser.add_argument("--samples", type=int, default=3, help="Hashes timed per cost")
+    args = parser.parse_args()
+
+    print(f"Target: {args.target_ms:.0f} ms per hash")
+    recommended = None
+    for cost in range(args.min_cost, args.max_cost + 1):
+        elapsed_ms = measure(cost, args.samples)
+        within = elapsed_ms <= args.target_ms
+        print(f"  cost {cost:2d}: {elapsed_ms:8.1f} ms{'' if within else '  (over target)'}")
+        if within:
+            recommended = cost
+        else:
+            break  # Each step doubles the time, so higher costs are over too
+
+    if recommended is None:
+        print(f"\nEven cost {args.min_cost} exceeds the target; consider a faster instance or a higher target.")
+        recommended = args.min_cost
+    print(f"\nRecommended: BCRYPT_ROUNDS={recommended}")
+    print("Login throughput per worker thread is roughly 1000 / hash time per second "
+          "(see PASSWORD_HASH_WORKERS).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+In-memory stand-in for the generated Prisma client, used by the benchmark scripts.
+It implements just the query surface the API uses (where/order/take/include and
+basic CRUD) and counts every query so benchmarks can report DB load.
+
+Call install() before importing anything from `app`.
+"""
+from __future__ import annotations
+
+import asyncio
+import sys
+import types
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+# Postgres orders enums by declaration order
+_ENUM_ORDER = {"UPCOMING": 0, "LIVE": 1, "COMPLETED": 2}
+
+
+class Sport(BaseModel):
+    id: str
+    name: str
+    slug: str
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class Match(BaseModel):
+    id: str
+    sportId: str
+    sport: Optional[Sport] = None
+    teamA: str
+    teamB: str
+    status: str
+    startTime: Optional[datetime] = None
+    venue: Optional[str] = None
+    score: Optional[Any] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class Announcement(BaseModel):
+    id: str
+    title: str
+    body: str
+    pinned: bool
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class User(BaseModel):
+    id: str
+    email: str
+    passwordHash: str
+    role: str
+    username: str
+    sportId: Optional[str] = None
+    sport: Optional[Sport] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+
+class Json:
+    """Stand-in for prisma.fields.Json."""
+
+    def __init__(self, data: Any) -> None:
+        self.data = data
+
+
+class QueryCounter:
+    """Counts queries; value can be backed by a multiprocessing.Value."""
+
+    def __init__(self, shared=None) -> None:
+        self._shared = shared
+        self._local = 0
+
+    def increment(self) -> None:
+        if self._shared is not None:
+            with self._shared.get_lock():
+                self._shared.value += 1
+        else:
+            self._local += 1
+
+    @property
+    def value(self) -> int:
+        return self._shared.value if self._shared is not None else self._local
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _sort_value(field: str, value: Any) -> Any:
+    return _ENUM_ORDER.get(value, value) if field == "status" else value
+
+
+def _matches_where(row: BaseModel, where: dict | None) -> bool:
+    for field, condition in (where or {}).items():
+        if field == "OR":
+            if not any(_matches_where(row, sub) for sub in condition):
+                return False
+            continue
+        if field == "AND":
+            if not all(_matches_where(row, sub) for sub in condition):
+                return False
+            continue
+
+        value = getattr(row, field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+
+        for op, arg in condition.items():
+            if op == "equals" and value != arg:
+                return False
+            if op == "in" and value not in arg:
+                return False
+            if op == "not_in" and value in arg:
+                return False
+            if op in ("gt", "gte", "lt", "lte"):
+                if value is None:
+                    return False
+                left, right = _sort_value(field, value), _sort_value(field, arg)
+                if op == "gt" and not left > right:
+                    return False
+                if op == "gte" and not left >= right:
+                    return False
+                if op == "lt" and not left < right:
+                    return False
+                if op == "lte" and not left <= right:
+                    return False
+    return True
+
+
+def _plain(data: dict) -> dict:
+    out = {}
+    for key, value in data.items():
+        if isinstance(value, Json):
+            value = value.data
+        elif hasattr(value, "value") and not isinstance(value, (str, int, float, bool)):
+            value = value.value  # str Enum
+        out[key] = value
+    return out
+
+
+class _Table:
+    def __init__(self, model: type[BaseModel], client: "InMemoryPrisma", counter: QueryCounter) -> None:
+        self.model = model
+        self.rows: dict[str, BaseModel] = {}
+        self._client = client
+        self._counter = counter
+
+    async def _query(self) -> None:
+        self._counter.increment()
+        # Yield to the event loop like a real round trip would
+        await asyncio.sleep(0)
+
+    def _out(self, row: BaseModel, include: dict | None) -> BaseModel:
+        row = row.model_copy()
+        if include and include.get("sport") and hasattr(row, "sportId"):
+            row.sport = self._client.sport.rows.get(row.sportId)
+        return row
+
+    async def find_many(self, where=None, include=None, order=None, take=None, skip=None, cursor=None):
+        await self._query()
+        rows = [row for row in self.rows.values() if _matches_where(row, where)]
+        if order:
+            for clause in reversed(order if isinstance(order, list) else [order]):
+                (field, direction), = clause.items()
+                rows.sort(key=lambda r: _sort_value(field, getattr(r, field)), reverse=direction == "desc")
+        if skip:
+            rows = rows[skip:]
+        if take is not None:
+            rows = rows[:take]
+        return [self._out(row, include) for row in rows]
+
+    async def find_unique(self, where, include=None):
+        await self._query()
+        for row in self.rows.values():
+            if _matches_where(row, where):
+                return self._out(row, include)
+        return None
+
+    async def find_first(self, where=None, include=None, order=None):
+        rows = await self.find_many(where=where, include=include, order=order, take=1)
+        return rows[0] if rows else None
+
+    async def count(self, where=None):
+        await self._query()
+        return sum(1 for row in self.rows.values() if _matches_where(row, where))
+
+    async def create(self, data, include=None):
+        await self._query()
+        data = _plain(data)
+        data.setdefault("id", uuid.uuid4().hex)
+        data.setdefault("createdAt", _now())
+        data["updatedAt"] = _now()
+        if self.model is Match:
+            data.setdefault("status", "UPCOMING")
+        if self.model is Announcement:
+            data.setdefault("pinned", False)
+        if self.model is User:
+            data.setdefault("role", "SPORT_ADMIN")
+        row = self.model(**data)
+        self.rows[row.id] = row
+        return self._out(row, include)
+
+    async def update(self, where, data, include=None):
+        await self._query()
+        row = self.rows.get(where["id"])
+        if row is None:
+            return None
+        row = row.model_copy(update={**_plain(data), "updatedAt": _now()})
+        self.rows[row.id] = row
+        return self._out(row, include)
+
+    async def update_many(self, where, data):
+        await self._query()
+        updated = 0
+        for row in list(self.rows.values()):
+            if _matches_where(row, where):
+                self.rows[row.id] = row.model_copy(update={**_plain(data), "updatedAt": _now()})
+                updated += 1
+        return updated
+
+    async def delete(self, where):
+        await self._query()
+        row = self.rows.pop(where["id"], None)
+        if row is None:
+            raise LookupError("Record to delete does not exist")
+        return row
+
+
+class InMemoryPrisma:
+    def __init__(self, counter: QueryCounter | None = None) -> None:
+        self.queries = counter or QueryCounter()
+        self.sport = _Table(Sport, self, self.queries)
+        self.match = _Table(Match, self, self.queries)
+        self.announcement = _Table(Announcement, self, self.queries)
+        self.user = _Table(User, self, self.queries)
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def connect(self) -> None:
+        self._connected = True
+
+    async def disconnect(self) -> None:
+        self._connected = False
+
+
+def install(counter: QueryCounter | None = None) -> InMemoryPrisma:
+    """Register the stand-in as app.db.prisma and return the client."""
+    client = InMemoryPrisma(counter)
+
+    async def connect_prisma(max_retries: int = 3) -> None:
+        await client.connect()
+
+    async def disconnect_prisma() -> None:
+        await client.disconnect()
+
+    prisma_module = types.ModuleType("app.db.prisma")
+    prisma_module.prisma = client
+    prisma_module.connect_prisma = connect_prisma
+    prisma_module.disconnect_prisma = disconnect_prisma
+
+    client_module = types.ModuleType("app.db.prisma_client")
+    fields_module = types.ModuleType("app.db.prisma_client.fields")
+    fields_module.Json = Json
+
+    sys.modules["app.db.prisma"] = prisma_module
+    sys.modules["app.db.prisma_client"] = client_module
+    sys.modules["app.db.prisma_client.fields"] = fields_module
+    return client